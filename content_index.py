@@ -0,0 +1,213 @@
+import os
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from content_search import is_binary, map_in_processes, DEFAULT_CONTENT_WORKERS
+from scanner import FileRecord
+from search_index import INDEX_DIR, index_path_for
+
+logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
+
+# Larger files are not broken into trigrams; they are always verified directly
+TRIGRAM_MAX_FILE_SIZE = 16 * 1024 * 1024
+
+# Trigrams of a target used in a query; fewer still give a correct superset
+TRIGRAM_QUERY_MAX = 256
+
+# Below this many changed files, trigrams are extracted without a process pool
+TRIGRAM_POOL_MIN_FILES = 64
+
+# Document states: binary or empty files never match, large files always might
+STATUS_SKIPPED = 0
+STATUS_INDEXED = 1
+STATUS_UNINDEXED = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    status INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS grams (
+    gram INTEGER NOT NULL,
+    doc INTEGER NOT NULL,
+    PRIMARY KEY (gram, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS grams_doc ON grams (doc);
+"""
+
+def trigram_key(data: bytes) -> int:
+    """Pack a three-byte sequence into the integer stored in the index."""
+    return int.from_bytes(data, 'big')
+
+def query_trigrams(target: str) -> List[int]:
+    """
+    Get the trigrams a file must contain to contain the target.
+
+    Trigrams are ASCII case-folded, so one index serves case-sensitive and
+    case-insensitive searches; matches are always verified afterwards.
+    """
+    data = target.encode('utf-8').lower()
+    return sorted({trigram_key(data[i:i + 3]) for i in range(len(data) - 2)})
+
+def file_trigrams(path: str) -> Tuple[int, List[int]]:
+    """
+    Read a file and collect its distinct case-folded trigrams.
+
+    Args:
+        path: File to read
+
+    Returns:
+        Tuple[int, List[int]]: Document status and the file's trigrams
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(TRIGRAM_MAX_FILE_SIZE + 1)
+    except OSError as e:
+        logging.error(f"Error indexing content of file {path}: {e}")
+        return STATUS_UNINDEXED, []
+    if len(data) > TRIGRAM_MAX_FILE_SIZE:
+        return STATUS_UNINDEXED, []
+    if not data or is_binary(data):
+        return STATUS_SKIPPED, []
+    data = data.lower()
+    grams = {data[i:i + 3] for i in range(len(data) - 2)}
+    return STATUS_INDEXED, [trigram_key(gram) for gram in grams]
+
+def _trigram_chunk(paths: List[str]) -> List[Tuple[int, List[int]]]:
+    return [file_trigrams(path) for path in paths]
+
+class ContentIndex:
+    """
+    Persistent trigram index of file contents for a single root directory.
+
+    Every text file below the root is stored with the set of byte trigrams it
+    contains. A content search first asks the index which files contain all
+    trigrams of a target and only verifies those, so repeated searches over a
+    large tree read a small fraction of it. Files are re-indexed only when
+    their size or mtime changed since the previous update.
+    """
+
+    def __init__(self, root: str, index_dir: Path = INDEX_DIR):
+        self.root = os.path.abspath(root)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = index_path_for(self.root, index_dir).with_suffix(".trigrams.sqlite")
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def update(self, records: Iterable[FileRecord], stop_event=None,
+               workers: int = DEFAULT_CONTENT_WORKERS) -> int:
+        """
+        Bring the index up to date with the given files.
+
+        Args:
+            records: Fresh metadata of every file below the root; indexed
+                files missing from it are dropped from the index
+            stop_event: Optional threading.Event that aborts the update when set
+            workers: Number of processes extracting trigrams
+
+        Returns:
+            int: Number of files that were (re)indexed
+        """
+        known: Dict[str, Tuple[int, int, float]] = {}
+        for doc_id, path, size, mtime in self.conn.execute("SELECT id, path, size, mtime FROM docs"):
+            known[path] = (doc_id, size, mtime)
+
+        seen: Set[int] = set()
+        changed: List[FileRecord] = []
+        for record in records:
+            entry = known.get(record.path)
+            if entry is not None:
+                seen.add(entry[0])
+                if entry[1] == record.size and entry[2] == record.mtime:
+                    continue
+            changed.append(record)
+
+        indexed = 0
+        try:
+            for record, (status, grams) in self._extract(changed, stop_event, workers):
+                self._store(record, known.get(record.path), status, grams)
+                indexed += 1
+            if stop_event is not None and stop_event.is_set():
+                return indexed
+
+            stale = [(doc_id,) for doc_id, _, _ in known.values() if doc_id not in seen]
+            self.conn.executemany("DELETE FROM grams WHERE doc = ?", stale)
+            self.conn.executemany("DELETE FROM docs WHERE id = ?", stale)
+            return indexed
+        finally:
+            self.conn.commit()
+
+    def _extract(self, records: List[FileRecord], stop_event,
+                 workers: int) -> Iterator[Tuple[FileRecord, Tuple[int, List[int]]]]:
+        """Extract trigrams of changed files, on a process pool for large batches."""
+        if workers <= 1 or len(records) < TRIGRAM_POOL_MIN_FILES:
+            for record in records:
+                if stop_event is not None and stop_event.is_set():
+                    return
+                yield record, file_trigrams(record.path)
+            return
+
+        yield from map_in_processes(_trigram_chunk, ((record, record.path) for record in records),
+                                    workers, stop_event)
+
+    def _store(self, record: FileRecord, entry: Optional[Tuple[int, int, float]],
+               status: int, grams: List[int]) -> None:
+        """Replace the stored trigrams of a single file."""
+        if entry is None:
+            cursor = self.conn.execute(
+                "INSERT INTO docs (path, size, mtime, status) VALUES (?, ?, ?, ?)",
+                (record.path, record.size, record.mtime, status)
+            )
+            doc_id = cursor.lastrowid
+        else:
+            doc_id = entry[0]
+            self.conn.execute(
+                "UPDATE docs SET size = ?, mtime = ?, status = ? WHERE id = ?",
+                (record.size, record.mtime, status, doc_id)
+            )
+            self.conn.execute("DELETE FROM grams WHERE doc = ?", (doc_id,))
+        self.conn.executemany("INSERT INTO grams (gram, doc) VALUES (?, ?)",
+                              [(gram, doc_id) for gram in grams])
+
+    def candidates(self, targets: Sequence[str]) -> Optional[Set[str]]:
+        """
+        Get the files that may contain any of the targets.
+
+        Args:
+            targets: Search targets
+
+        Returns:
+            Optional[Set[str]]: Paths to verify, or None when a target is too
+            short to narrow the search and every file must be scanned
+        """
+        paths: Set[str] = set()
+        for target in targets:
+            grams = query_trigrams(target)[:TRIGRAM_QUERY_MAX]
+            if not grams:
+                return None
+            placeholders = ",".join("?" * len(grams))
+            paths.update(path for path, in self.conn.execute(
+                "SELECT path FROM docs WHERE id IN ("
+                f"SELECT doc FROM grams WHERE gram IN ({placeholders}) "
+                "GROUP BY doc HAVING COUNT(*) = ?)",
+                (*grams, len(grams))
+            ))
+        paths.update(path for path, in self.conn.execute(
+            "SELECT path FROM docs WHERE status = ?", (STATUS_UNINDEXED,)
+        ))
+        return paths
@@ -0,0 +1,341 @@
+import os
+import re
+import mmap
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Sequence, Set, Tuple
+
+logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
+
+# Files with a NUL byte in their first block are treated as binary and skipped
+BINARY_SNIFF_BYTES = 8192
+
+# Worker processes scanning file contents, and files handed to a worker at once
+DEFAULT_CONTENT_WORKERS = os.cpu_count() or 1
+CONTENT_CHUNK_FILES = 32
+
+# Hits reported per file before moving on, and longest snippet shown per hit
+DEFAULT_MAX_HITS = 10
+SNIPPET_MAX_CHARS = 160
+
+# Bytes counted for newlines per slice, so line numbers never copy a whole file
+NEWLINE_COUNT_CHUNK = 1 << 20
+
+# Up to this many targets each is looked for with find(), which ran 3-30x
+# faster than one combined regex on a 42 MB file up to 128 targets; larger
+# sets are scanned once with the regex
+CONTENT_FIND_MAX_TARGETS = 128
+
+# Files are searched in windows of this many bytes; case-insensitive searches
+# lower-case one window at a time
+CONTENT_SCAN_CHUNK = 8 * 1024 * 1024
+
+class ContentHit(NamedTuple):
+    """Where a target was found in a file's content."""
+    target: str
+    line: int
+    offset: int
+    snippet: str
+
+class ContentPattern:
+    """
+    Search targets compiled for scanning file contents.
+
+    Up to CONTENT_FIND_MAX_TARGETS targets are each found with find(), which
+    runs at memchr speed and finds overlapping hits. Larger sets are compiled
+    into one bytes regex, so a file is scanned once for every target
+    together. Case-insensitive matching folds ASCII letters only, as bytes
+    regexes do.
+    """
+
+    def __init__(self, targets: Sequence[str], case_sensitive: bool):
+        self.targets = list(dict.fromkeys(targets))
+        self.case_sensitive = case_sensitive
+        encoded = [target.encode('utf-8') for target in self.targets]
+        exact: Dict[bytes, List[int]] = {}
+        for index, key in enumerate(encoded):
+            exact.setdefault(self._fold(key), []).append(index)
+        self.keys = exact
+        self.longest = max((len(key) for key in exact), default=1)
+        self.regex: Optional[Pattern[bytes]] = None
+        self.indices: Dict[bytes, List[int]] = {}
+        if len(exact) <= CONTENT_FIND_MAX_TARGETS:
+            return
+
+        # The regex reports only the longest target at each position, so a hit
+        # also stands for every target that is a prefix of it
+        for key in exact:
+            self.indices[key] = sorted(
+                index for length in range(1, len(key) + 1) for index in exact.get(key[:length], ())
+            )
+
+        # A lookahead tries every position, so overlapping targets are all found;
+        # longest first so a target is not shadowed by one of its prefixes
+        alternatives = sorted(set(encoded), key=len, reverse=True)
+        flags = 0 if case_sensitive else re.IGNORECASE
+        self.regex = re.compile(
+            b'(?=(' + b'|'.join(re.escape(key) for key in alternatives) + b'))', flags
+        )
+
+    def _fold(self, data: bytes) -> bytes:
+        return data if self.case_sensitive else data.lower()
+
+    def target_indices(self, matched: bytes) -> List[int]:
+        """Get the indices of the targets a matched byte string stands for."""
+        return self.indices.get(self._fold(matched), [])
+
+    def _windows(self, data) -> Iterator[Tuple[bytes, int, int, int]]:
+        """
+        Split data into windows to search with find().
+
+        Yields:
+            (haystack, base, start, end): Hits starting in data[start:end] are
+            found in haystack, whose offset 0 is at data[base]
+        """
+        for start in range(0, len(data), CONTENT_SCAN_CHUNK):
+            end = min(len(data), start + CONTENT_SCAN_CHUNK)
+            if self.case_sensitive:
+                yield data, 0, start, end
+            else:
+                # Reaches into the next window so hits across the boundary are found
+                yield data[start:end + self.longest - 1].lower(), start, start, end
+
+    def find_targets(self, data) -> Set[int]:
+        """Get the indices of the targets that occur in data."""
+        found: Set[int] = set()
+        if self.regex is not None:
+            for match in self.regex.finditer(data):
+                found.update(self.target_indices(match.group(1)))
+                if len(found) == len(self.targets):
+                    break
+            return found
+
+        remaining = dict(self.keys)
+        for haystack, base, start, end in self._windows(data):
+            for key in list(remaining):
+                if haystack.find(key, start - base, end - base + len(key) - 1) != -1:
+                    found.update(remaining.pop(key))
+            if not remaining:
+                break
+        return found
+
+    def iter_hits(self, data) -> Iterator[Tuple[int, List[int]]]:
+        """Yield the offset of every hit in data, in order, with the indices of its targets."""
+        if self.regex is not None:
+            for match in self.regex.finditer(data):
+                yield match.start(), self.target_indices(match.group(1))
+            return
+
+        for haystack, base, start, end in self._windows(data):
+            hits: Dict[int, List[int]] = {}
+            for key, indices in self.keys.items():
+                stop = end - base + len(key) - 1
+                offset = haystack.find(key, start - base, stop)
+                while offset != -1:
+                    hits.setdefault(base + offset, []).extend(indices)
+                    offset = haystack.find(key, offset + 1, stop)
+            for offset in sorted(hits):
+                yield offset, sorted(hits[offset])
+
+def is_binary(data) -> bool:
+    """Check whether a leading block of file content looks binary."""
+    return b'\0' in data[:BINARY_SNIFF_BYTES]
+
+def search_file_bytes(file_path: str, pattern: ContentPattern) -> List[int]:
+    """
+    Find which targets occur in a file.
+
+    The file is memory-mapped rather than read, so large files are scanned
+    without being loaded into memory, and the scan stops as soon as every
+    target was found. Binary files are skipped after their first block.
+
+    Args:
+        file_path: Path of the file to scan
+        pattern: Compiled search targets
+
+    Returns:
+        List[int]: Indices of the targets found, in target order
+    """
+    found = set()
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if is_binary(data):
+                    return []
+                found = pattern.find_targets(data)
+    except (OSError, ValueError) as e:
+        logging.error(f"Error searching content in file {file_path}: {e}")
+    return sorted(found)
+
+def count_newlines(data, start: int, end: int) -> int:
+    """Count newlines in data[start:end] without copying it all at once."""
+    count = 0
+    for position in range(start, end, NEWLINE_COUNT_CHUNK):
+        count += data[position:min(position + NEWLINE_COUNT_CHUNK, end)].count(b'\n')
+    return count
+
+def line_snippet(data, offset: int) -> str:
+    """Get the text of the line containing offset, cut to SNIPPET_MAX_CHARS."""
+    line_start = data.rfind(b'\n', max(0, offset - SNIPPET_MAX_CHARS), offset) + 1
+    if line_start == 0 and offset > SNIPPET_MAX_CHARS:
+        line_start = offset - SNIPPET_MAX_CHARS // 2  # Very long line: centre on the hit
+    line_end = data.find(b'\n', offset, line_start + SNIPPET_MAX_CHARS * 4)
+    if line_end == -1:
+        line_end = min(len(data), line_start + SNIPPET_MAX_CHARS * 4)
+    text = data[line_start:line_end].decode('utf-8', errors='replace').strip()
+    return text[:SNIPPET_MAX_CHARS]
+
+def search_file_hits(file_path: str, pattern: ContentPattern,
+                     max_hits: int = DEFAULT_MAX_HITS) -> List[ContentHit]:
+    """
+    Find where targets occur in a file.
+
+    Scans the memory-mapped file like search_file_bytes, tracking line numbers
+    as it goes, and stops after max_hits hits.
+
+    Args:
+        file_path: Path of the file to scan
+        pattern: Compiled search targets
+        max_hits: Maximum number of hits to report for this file
+
+    Returns:
+        List[ContentHit]: Hits in file order
+    """
+    hits: List[ContentHit] = []
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return hits
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if is_binary(data):
+                    return hits
+                line = 1
+                counted = 0
+                for offset, indices in pattern.iter_hits(data):
+                    line += count_newlines(data, counted, offset)
+                    counted = offset
+                    snippet = line_snippet(data, offset)
+                    for index in indices:
+                        hits.append(ContentHit(pattern.targets[index], line, offset, snippet))
+                        if len(hits) >= max_hits:
+                            return hits
+    except (OSError, ValueError) as e:
+        logging.error(f"Error searching content in file {file_path}: {e}")
+    return hits
+
+def map_in_processes(function: Callable[[List[str]], List[Any]], files: Iterable[Tuple[Hashable, str]],
+                     workers: int, stop_event=None, initializer=None,
+                     initargs: tuple = ()) -> Iterator[Tuple[Hashable, Any]]:
+    """
+    Apply a function to files in chunks on a pool of worker processes.
+
+    Files are handed to the pool in chunks of CONTENT_CHUNK_FILES, with a
+    bounded number of chunks in flight, so huge trees can be streamed through
+    without queueing every path. Results are yielded as soon as their chunk
+    is done, so not necessarily in input order.
+
+    Args:
+        function: Module-level function mapping a list of paths to a result per path
+        files: (key, path) pairs; the key is passed back with the result
+        workers: Number of worker processes
+        stop_event: Optional threading.Event that stops the pool when set
+        initializer: Optional function run once in every worker process
+        initargs: Arguments of the initializer
+
+    Yields:
+        Tuple[Hashable, Any]: Key of a file and the function's result for it
+    """
+    # Spawn rather than fork: the caller runs next to Tk and other threads
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=initializer, initargs=initargs) as executor:
+        pending = {}
+        chunk: List[Tuple[Hashable, str]] = []
+        max_pending = workers * 2
+
+        def submit():
+            future = executor.submit(function, [path for _, path in chunk])
+            pending[future] = [key for key, _ in chunk]
+
+        def completed(block: bool):
+            done, _ = wait(pending, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from zip(pending.pop(future), future.result())
+
+        try:
+            for item in files:
+                if stop_event is not None and stop_event.is_set():
+                    return
+                chunk.append(item)
+                if len(chunk) >= CONTENT_CHUNK_FILES:
+                    submit()
+                    chunk = []
+                    yield from completed(block=len(pending) >= max_pending)
+
+            if chunk:
+                submit()
+            while pending:
+                if stop_event is not None and stop_event.is_set():
+                    return
+                yield from completed(block=True)
+        finally:
+            for future in pending:
+                future.cancel()
+
+# Pattern and hit limit set once per worker process by the pool initializer
+_worker_pattern: Optional[ContentPattern] = None
+_worker_max_hits = DEFAULT_MAX_HITS
+
+def _init_worker(targets: Sequence[str], case_sensitive: bool, max_hits: int) -> None:
+    global _worker_pattern, _worker_max_hits
+    _worker_pattern = ContentPattern(targets, case_sensitive)
+    _worker_max_hits = max_hits
+
+def _search_chunk(paths: List[str]) -> List[List[ContentHit]]:
+    return [search_file_hits(path, _worker_pattern, _worker_max_hits) for path in paths]
+
+class ContentSearcher:
+    """
+    Search file contents for many targets on a pool of worker processes.
+
+    Files are streamed through map_in_processes, so huge trees are searched
+    without queueing every path.
+    """
+
+    def __init__(self, targets: Sequence[str], case_sensitive: bool,
+                 max_hits: int = DEFAULT_MAX_HITS, workers: int = DEFAULT_CONTENT_WORKERS):
+        self.pattern = ContentPattern(targets, case_sensitive)
+        self.max_hits = max(1, max_hits)
+        self.workers = max(1, workers)
+
+    def search(self, files: Iterable[Tuple[Hashable, str]],
+               stop_event=None) -> Iterator[Tuple[Hashable, List[ContentHit]]]:
+        """
+        Scan files and yield the hits of each file containing a target.
+
+        Results are yielded per file as soon as its chunk has been scanned.
+
+        Args:
+            files: (key, path) pairs; the key is passed back with the result
+            stop_event: Optional threading.Event that stops the search when set
+
+        Yields:
+            Tuple[Hashable, List[ContentHit]]: Key of a matching file and its hits
+        """
+        if self.workers == 1:
+            for key, path in files:
+                if stop_event is not None and stop_event.is_set():
+                    return
+                hits = search_file_hits(path, self.pattern, self.max_hits)
+                if hits:
+                    yield key, hits
+            return
+
+        results = map_in_processes(_search_chunk, files, self.workers, stop_event, _init_worker,
+                                   (self.pattern.targets, self.pattern.case_sensitive, self.max_hits))
+        for key, hits in results:
+            if hits:
+                yield key, hits
@@ -0,0 +1,109 @@
+import os
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
+
+# Send2Trash is optional; without it files are deleted permanently
+try:
+    from send2trash import send2trash
+except ImportError:
+    send2trash = None
+
+from transfer_engine import TransferProgress
+
+logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
+
+# Files handed to one send2trash call, or unlinked by one worker task
+DELETE_BATCH_SIZE = 256
+
+# Threads unlinking files; deletes are metadata round-trips, not disk bandwidth
+DEFAULT_DELETE_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+def group_by_directory(paths: Sequence[str]) -> List[List[str]]:
+    """
+    Split paths into batches of files sharing a parent directory.
+
+    Each batch holds at most DELETE_BATCH_SIZE files, so a worker touches one
+    directory at a time, which keeps lookups on network file systems local.
+    """
+    groups: Dict[str, List[str]] = defaultdict(list)
+    for path in paths:
+        groups[os.path.dirname(path)].append(path)
+    return [files[i:i + DELETE_BATCH_SIZE]
+            for _, files in sorted(groups.items())
+            for i in range(0, len(files), DELETE_BATCH_SIZE)]
+
+class DeleteEngine:
+    """
+    Delete many files, to the trash in batched calls or by parallel unlinks.
+
+    Files are grouped by directory. With Send2Trash each group goes to the
+    trash in a single call; otherwise groups are unlinked on a pool of
+    threads. Progress is kept in a TransferProgress that the caller can poll
+    from any thread instead of repainting per file.
+    """
+
+    operation = "delete"
+
+    def __init__(self, sources: Sequence[str], use_trash: bool = True,
+                 workers: int = DEFAULT_DELETE_WORKERS, stop_event=None):
+        self.sources = list(sources)
+        self.use_trash = use_trash and send2trash is not None
+        self.workers = max(1, workers)
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.progress = TransferProgress(len(self.sources))
+
+    def run(self) -> TransferProgress:
+        """
+        Perform the delete. Blocks until every file is done or cancelled.
+
+        Returns:
+            TransferProgress: Final counters, including the failed files
+        """
+        batches = group_by_directory(self.sources)
+        if self.use_trash:
+            # The trash is a single directory per volume; parallel calls only contend on it
+            for batch in batches:
+                if self.stop_event.is_set():
+                    break
+                self._trash(batch)
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="delete") as pool:
+                for batch in batches:
+                    pool.submit(self._unlink, batch)
+        return self.progress
+
+    def _trash(self, batch: List[str]) -> None:
+        self.progress.file_started(batch[0])
+        try:
+            send2trash(batch)
+        except Exception:
+            # Send2Trash stops at the first failure; files trashed before it are
+            # gone and done, the rest are retried one at a time to find the failures
+            for path in batch:
+                if not os.path.lexists(path):
+                    self.progress.file_done(path)
+                    continue
+                try:
+                    send2trash(path)
+                    self.progress.file_done(path)
+                except Exception as e:
+                    logging.error(f"Error moving file {path} to trash: {e}")
+                    self.progress.file_done(path, str(e))
+            return
+        for path in batch:
+            self.progress.file_done(path)
+
+    def _unlink(self, batch: List[str]) -> None:
+        self.progress.file_started(batch[0])
+        for path in batch:
+            if self.stop_event.is_set():
+                return
+            try:
+                os.remove(path)
+                self.progress.file_done(path)
+            except OSError as e:
+                logging.error(f"Error deleting file {path}: {e}")
+                self.progress.file_done(path, str(e))
@@ -0,0 +1,93 @@
+import queue
+import time
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
+
+# Pump settings: delay between ticks and time spent applying events per tick
+DISPATCH_INTERVAL_MS = 50
+DISPATCH_BUDGET_SECONDS = 0.02
+
+class ProgressEvent(NamedTuple):
+    """Running counters of a background job, with an optional status message."""
+    found: int
+    scanned: int
+    message: str = ""
+
+class ResultBatchEvent(NamedTuple):
+    """A batch of (target, FileRecord, content hits) matches to show."""
+    results: List[Tuple[str, Any, List[Any]]]
+
+class ErrorEvent(NamedTuple):
+    """An error to report to the user."""
+    message: str
+
+class DoneEvent(NamedTuple):
+    """The job has finished; carries its final results unless they were streamed."""
+    results: Any
+    search_type: str = "All"
+
+class UIDispatcher:
+    """
+    Thread-safe channel from worker threads to the Tk main loop.
+
+    Workers post typed events from any thread. The main loop drains them on a
+    root.after timer and calls the handler registered for each event type,
+    spending at most DISPATCH_BUDGET_SECONDS per tick so the GUI keeps
+    responding however fast events arrive.
+    """
+
+    def __init__(self, root, interval_ms: int = DISPATCH_INTERVAL_MS,
+                 budget: float = DISPATCH_BUDGET_SECONDS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.budget = budget
+        self.events: queue.Queue = queue.Queue()
+        self.handlers: Dict[type, Callable[[Any], None]] = {}
+        self.running = False
+
+    def register(self, event_type: type, handler: Callable[[Any], None]) -> None:
+        """Call handler on the main loop for every event of event_type."""
+        self.handlers[event_type] = handler
+
+    def post(self, event) -> None:
+        """Queue an event for the main loop. Safe to call from any thread."""
+        if self.running:
+            self.events.put(event)
+
+    def start(self) -> None:
+        """Start applying events on the main loop."""
+        self.running = True
+        self.root.after(self.interval_ms, self._pump)
+
+    def stop(self) -> None:
+        """Stop applying events and drop any that are still queued."""
+        self.running = False
+        while True:
+            try:
+                self.events.get_nowait()
+            except queue.Empty:
+                break
+
+    def _pump(self) -> None:
+        if not self.running:
+            return
+
+        deadline = time.monotonic() + self.budget
+        while time.monotonic() < deadline:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            handler = self.handlers.get(type(event))
+            if handler is None:
+                continue
+            try:
+                handler(event)
+            except Exception as e:
+                logging.exception(f"Error handling {type(event).__name__}: {e}")
+            if not self.running:
+                return
+
+        self.root.after(self.interval_ms, self._pump)
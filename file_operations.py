@@ -1,95 +1,53 @@
 import os
-import shutil
 import difflib
 from tkinter import filedialog, messagebox
-from datetime import datetime
-from utils import format_size
+from utils import format_size, format_duration
 from collections import defaultdict
 import logging
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk
-from typing import Dict, List, Optional, Set
-from pathlib import Path
+from typing import Set
+from content_search import ContentPattern, search_file_bytes
+# The GUI-free search core is re-exported for existing callers
+from search_core import SearchOptions, search_files, select_rows_by_type
+from transfer_engine import TransferEngine
+from operation_journal import OperationJournal, BATCH_ABANDONED, write_failure_report
+from hash_cache import HashCache
+from delete_engine import DeleteEngine
+
+# Progress windows repaint at this many frames per second, however fast the
+# workers go; workers only bump counters and never touch Tk
+PROGRESS_FRAME_RATE = 10
+PROGRESS_FRAME_MS = 1000 // PROGRESS_FRAME_RATE
 
 logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
 
-def search_files(app) -> None:
+def get_search_options(app) -> SearchOptions:
     """
-    Search for files in the specified directory based on user input.
-    
-    Args:
-        app: The application instance containing search parameters and UI elements.
-    """
-    try:
-        directory = Path(app.directory_entry.get())
-        if not directory.exists():
-            show_error(app, "Directory does not exist")
-            return
-
-        exact_match = app.exact_match_var.get()
-        case_sensitive = app.case_sensitive_checkbox.instate(['selected'])
-        search_content = app.search_content_checkbox.instate(['selected'])
-        search_type = app.search_type_var.get()
-
-        extensions = get_extensions(app)
-        filenames = app.file_names_text.get("1.0", "end").strip().split('\n')
-        filenames = [filename.strip() for filename in filenames if filename.strip()]
-
-        if not directory:
-            show_error(app, "Please select a directory")
-            return
-
-        if not filenames:
-            show_error(app, "Please enter filenames")
-            return
-
-        # Clear existing results
-        app.results_tree.delete(*app.results_tree.get_children())
-        app.selected_files = []
-
-        logging.info(f"Searching in directory: {directory}")
-        logging.info(f"Searching for files: {filenames}")
-
-        # Optimize search with set for O(1) lookups
-        extension_set: Set[str] = set(extensions)
-        
-        # Use generator to reduce memory usage
-        def file_generator():
-            for root, _, files in os.walk(directory):
-                if app.stop_event.is_set():
-                    return
-                for file in files:
-                    if app.stop_event.is_set():
-                        return
-                    yield root, file
-
-        found_files = defaultdict(list)
-        for root, file in file_generator():
-            file_path = Path(root) / file
-            if not extensions or file_path.suffix.lower() in extension_set:
-                for target in filenames:
-                    if is_match(file, target, extension_set, exact_match, case_sensitive):
-                        found_files[target].append(str(file_path))
-                        logging.info(f"Found match: {file_path}")
-
-        logging.info(f"Total files found: {sum(len(files) for files in found_files.values())}")
+    Read the search parameters from the UI. Must run on the Tk main thread.
 
-        # Display results
-        app.results_tree.delete(*app.results_tree.get_children())  # Clear existing results
-        
-        if found_files:
-            display_results(app, found_files, search_type)  # Use display_results to filter & show
-        else:
-            app.update_status("No files found")
+    Args:
+        app: The application instance containing the search widgets.
 
-    except Exception as e:
-        logging.exception("Search error")
-        show_error(app, f"Search error: {str(e)}")
-    finally:
-        app.search_button.config(state="normal")
-        app.stop_button.config(state=tk.DISABLED)
-        app.loading_indicator.stop()
-        app.loading_indicator.pack_forget()
+    Returns:
+        SearchOptions: Snapshot of the current search parameters
+    """
+    filenames = app.file_names_text.get("1.0", "end").strip().split('\n')
+    return SearchOptions(
+        directory=app.directory_entry.get(),
+        filenames=[filename.strip() for filename in filenames if filename.strip()],
+        extensions=get_extensions(app),
+        exact_match=app.exact_match_var.get(),
+        case_sensitive=app.case_sensitive_checkbox.instate(['selected']),
+        search_content=app.search_content_checkbox.instate(['selected']),
+        search_type=app.search_type_var.get(),
+        use_index=app.use_index_var.get(),
+        scan_workers=app.scan_workers,
+        max_hits=app.content_max_hits,
+        match_mode=app.match_mode_var.get()
+    )
 
 def get_extensions(app):
     """
@@ -186,109 +144,6 @@ def is_exact_match(file, target, extensions, case_sensitive):
                 break
     return matched
 
-def display_results(app, file_paths, search_type):
-    """
-    Display the search results in the application's results tree.
-    """
-    logging.info(f"Displaying results for search type: {search_type}")
-    app.results_tree.delete(*app.results_tree.get_children())
-
-    if search_type == "All":
-        # Show all results grouped by target
-        for target, paths in file_paths.items():
-            parent = app.results_tree.insert('', 'end', text=target, values=("", "", "", ""))
-            for index, file_path in enumerate(paths):
-                logging.info(f"Inserting file: {file_path}")
-                app.insert_file_result(parent, file_path, index)
-    else:
-        # Get unique files based on search type
-        selected_files = select_files_by_type(file_paths, search_type)
-        if not selected_files:
-            app.update_status("No matching files found")
-            return
-
-        # Sort results if needed
-        sort_by = app.sort_by_var.get()
-        if sort_by == "Size":
-            selected_files.sort(key=lambda x: os.path.getsize(x))
-        elif sort_by == "Date":
-            selected_files.sort(key=os.path.getmtime)
-
-        # Display unique results
-        for index, file_path in enumerate(selected_files):
-            app.insert_file_result('', file_path, index)
-
-        # Update status
-        app.update_status(f"Found {len(selected_files)} file(s)")
-
-def insert_file_result(app, parent, file_path, index):
-    """Insert a file result into the results tree."""
-    try:
-        size = format_size(os.path.getsize(file_path))
-        date_modified = datetime.fromtimestamp(os.path.getmtime(file_path)).strftime('%Y-%m-%d %H:%M:%S')
-        tag = 'evenrow' if index % 2 == 0 else 'oddrow'
-        
-        values = (
-            os.path.basename(file_path),  # Filename
-            file_path,                    # Full path
-            size,                         # File size
-            date_modified                 # Modified date
-        )
-        
-        item_id = app.results_tree.insert(
-            parent, 'end',
-            values=values,
-            tags=(tag,)
-        )
-        
-        logging.info(f"Inserted item: {values}")
-        return item_id
-        
-    except Exception as e:
-        logging.error(f"Error inserting file result: {str(e)}")
-        return None
-
-def select_files_by_type(file_paths, search_type):
-    """
-    Select files based on the specified search type (e.g., Newest, Oldest).
-    Ensures only one version of each file is selected based on the search type.
-
-    Parameters:
-    file_paths (defaultdict): A dictionary of filenames and their corresponding file paths.
-    search_type (str): The type of search to perform.
-
-    Returns:
-    list: A list of selected file paths based on the search type.
-    """
-    # Create a dictionary to store the best match for each base filename
-    unique_files = {}
-    
-    # Flatten all paths and group by base filename
-    all_files = {}
-    for paths in file_paths.values():
-        for path in paths:
-            base_name = os.path.basename(path).lower()  # Use lowercase for consistency
-            if base_name not in all_files:
-                all_files[base_name] = []
-            all_files[base_name].append(path)
-    
-    # Select the appropriate version for each unique base filename
-    for base_name, versions in all_files.items():
-        if versions:
-            if search_type == "Newest":
-                selected = max(versions, key=os.path.getmtime)
-            elif search_type == "Oldest":
-                selected = min(versions, key=os.path.getmtime)
-            elif search_type == "Largest":
-                selected = max(versions, key=os.path.getsize)
-            elif search_type == "Smallest":
-                selected = min(versions, key=os.path.getsize)
-            else:
-                continue
-            unique_files[base_name] = selected
-
-    return list(unique_files.values())
-
 def search_file_content(file_path, search_text):
     """
     Search for the specified text within a file.
@@ -300,21 +155,26 @@ def search_file_content(file_path, search_text):
     Returns:
     bool: True if the text is found in the file, False otherwise.
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-            return search_text in content
-    except Exception as e:
-        logging.error(f"Error searching content in file {file_path}: {e}")
-        return False
+    return bool(search_file_bytes(file_path, ContentPattern([search_text], case_sensitive=True)))
+
+def perform_file_operation(app, operation):
+    """
+    Copy, move or delete the selected search results.
 
-def perform_file_operation(results_tree, operation):
+    Parameters:
+    app (object): The application instance holding the results selection.
+    operation (str): One of 'copy', 'move' or 'delete'.
+    """
     try:
-        selected_items = results_tree.selection()
-        if not selected_items:
+        selected_paths = app.get_selected_paths()
+        if not selected_paths:
             messagebox.showerror("Error", "No files selected")
             return
 
+        if operation == 'delete':
+            start_transfer(app, DeleteEngine(selected_paths))
+            return
+
         if operation in ['copy', 'move']:
             destination = filedialog.askdirectory()
             if not destination:
@@ -323,133 +183,202 @@ def perform_file_operation(results_tree, operation):
                 messagebox.showerror("Error", "Selected destination does not exist")
                 return
 
-        # Create progress window
-        progress_window = create_progress_window(results_tree, len(selected_items))
-        
-        try:
-            for i, item in enumerate(selected_items, 1):
-                file_path = results_tree.item(item)['values'][1]
-                if not os.path.exists(file_path):
-                    logging.error(f"File not found: {file_path}")
-                    continue
-
-                update_progress(progress_window, i, len(selected_items), file_path)
-                
-                try:
-                    if operation == 'delete':
-                        delete_file(file_path)
-                    elif operation == 'copy':
-                        copy_file(file_path, destination)
-                    elif operation == 'move':
-                        move_file(file_path, destination)
-                except Exception as e:
-                    logging.error(f"Operation failed for {file_path}: {str(e)}")
-                    
-        finally:
-            progress_window.destroy()
-            
-        messagebox.showinfo("Success", "Operation completed")
-        
+            # Copies and moves run on a background engine; the window only polls its counters
+            start_transfer(app, TransferEngine(operation, selected_paths, destination, journal=open_journal(),
+                                               verify=app.verify_copies,
+                                               hash_cache=open_hash_cache() if app.verify_copies else None))
+            return
+
+        messagebox.showerror("Error", f"Unknown operation: {operation}")
+
     except Exception as e:
         logging.error(f"File operation error: {str(e)}")
         messagebox.showerror("Error", f"Operation failed: {str(e)}")
 
-def create_progress_window(parent, total_files):
-    progress = tk.Toplevel(parent)
-    progress.title("Operation Progress")
-    progress.geometry("400x150")
-    progress.transient(parent)
-    progress.grab_set()  # Make window modal
-    
-    progress.label = tk.Label(progress, text="Processing files...")
-    progress.label.pack(pady=10)
-    
-    progress.progressbar = ttk.Progressbar(progress, length=300, mode='determinate')
-    progress.progressbar.pack(pady=10)
-    
-    progress.file_label = tk.Label(progress, text="", wraplength=380)
-    progress.file_label.pack(pady=5)
-    
-    return progress
+def open_journal():
+    """Open the operation journal, or return None if it cannot be opened."""
+    try:
+        return OperationJournal()
+    except Exception as e:
+        logging.error(f"Error opening operation journal: {e}")
+        return None
 
-def update_progress(window, current, total, current_file):
-    window.label.config(text=f"Processing files... ({current}/{total})")
-    window.progressbar['value'] = (current / total) * 100
-    window.file_label.config(text=f"Current file: {os.path.basename(current_file)}")
-    window.update()
+def open_hash_cache():
+    """Open the persistent hash cache, or return None if it cannot be opened."""
+    try:
+        return HashCache()
+    except Exception as e:
+        logging.error(f"Error opening hash cache: {e}")
+        return None
 
-def copy_file(file_path, destination):
+def start_transfer(app, engine, on_done=None):
     """
-    Copy a file to the specified destination.
+    Run a transfer engine in the background behind a progress window.
 
     Parameters:
-    file_path (str): The path of the file to copy.
-    destination (str): The destination directory.
+    app (object): The application instance owning the window.
+    engine (TransferEngine or DeleteEngine): The operation to run.
+    on_done (callable): Optional function called after the final report.
     """
-    try:
-        base_name = os.path.basename(file_path)
-        destination_path = os.path.join(destination, base_name)
+    progress_window = create_progress_window(app.root, engine.progress.files_total,
+                                             on_cancel=engine.stop_event.set)
+    worker = threading.Thread(target=engine.run, daemon=True)
+    worker.start()
+    watch_transfer(progress_window, engine, worker, on_done)
 
-        if os.path.exists(destination_path):
-            destination_path = handle_existing_file(destination_path)
+def watch_transfer(window, engine, worker, on_done=None):
+    """
+    Repaint the progress window from the engine's counters until the worker ends.
 
-        shutil.copy(file_path, destination_path)
-    except Exception as e:
-        logging.error(f"Error copying file {file_path} to {destination}: {e}")
+    Runs as a fixed-rate frame loop on the Tk timer: each frame takes one
+    snapshot of the counters, paints it, and schedules the next frame so
+    frames start PROGRESS_FRAME_MS apart.
 
-def move_file(file_path, destination):
+    Parameters:
+    window (tk.Toplevel): The progress window from create_progress_window.
+    engine (TransferEngine or DeleteEngine): The running operation.
+    worker (threading.Thread): The thread running the transfer.
+    on_done (callable): Optional function called after the final report.
+    """
+    frame_start = time.monotonic()
+    snapshot = engine.progress.snapshot()
+    if worker.is_alive():
+        show_transfer_progress(window, snapshot)
+        spent_ms = int((time.monotonic() - frame_start) * 1000)
+        window.after(max(1, PROGRESS_FRAME_MS - spent_ms), watch_transfer, window, engine, worker, on_done)
+        return
+
+    window.destroy()
+    journal = getattr(engine, 'journal', None)
+    if journal is not None:
+        journal.prune()
+        journal.close()
+    hash_cache = getattr(engine, 'hash_cache', None)
+    if hash_cache is not None:
+        hash_cache.close()
+    report_transfer(engine.operation, snapshot, engine.progress.failures, engine.stop_event.is_set(),
+                    engine.progress.error)
+    if on_done is not None:
+        on_done()
+
+def report_transfer(operation, snapshot, failures, cancelled=False, error=None):
+    """Show the end-of-run summary, writing failed files to a report file."""
+    processed = snapshot.files_done - snapshot.failures
+    summary = f"{processed} of {snapshot.files_total} file(s) processed in {format_duration(snapshot.elapsed)}"
+    if cancelled:
+        summary = f"{operation.capitalize()} cancelled; {summary}"
+    if error is not None:
+        report_path = write_failure_report(operation, failures)
+        details = f"\n\nFailed files: {report_path}" if report_path else ""
+        messagebox.showerror("Error", f"{operation.capitalize()} failed: {error}\n\n{summary}{details}")
+        return
+    if not failures:
+        if cancelled:
+            messagebox.showinfo("Cancelled", summary)
+        else:
+            messagebox.showinfo("Success", "Operation completed")
+        return
+    report_path = write_failure_report(operation, failures)
+    listed = "\n".join(f"{os.path.basename(path)}: {error}" for path, error in failures[:10])
+    if len(failures) > 10:
+        listed += f"\n... and {len(failures) - 10} more"
+    messagebox.showwarning(
+        "Cancelled" if cancelled else "Completed with errors",
+        f"{summary}; {snapshot.failures} failed:\n\n{listed}\n\n"
+        f"Full report: {report_path or 'see app_errors.log'}"
+    )
+
+def resume_interrupted_operations(app):
     """
-    Move a file to the specified destination.
+    Offer to resume copies and moves that were cut short by a crash or exit.
+
+    Batches are offered one at a time; a declined batch is abandoned.
 
     Parameters:
-    file_path (str): The path of the file to move.
-    destination (str): The destination directory.
+    app (object): The application instance owning the progress window.
     """
-    try:
-        base_name = os.path.basename(file_path)
-        destination_path = os.path.join(destination, base_name)
-
-        if os.path.exists(destination_path):
-            destination_path = handle_existing_file(destination_path)
+    journal = open_journal()
+    if journal is None:
+        return
+    # Another instance may claim a batch between listing and claiming it
+    batch = next((batch for batch in journal.interrupted() if journal.claim(batch.id)), None)
+    if batch is None:
+        journal.close()
+        return
+
+    remaining = batch.steps - batch.done
+    if messagebox.askyesno(
+        "Resume operation",
+        f"A {batch.operation} of {batch.steps} file(s) to {batch.destination} was interrupted "
+        f"with {remaining} file(s) left. Resume it now?"
+    ):
+        engine = TransferEngine.resume(journal, batch.id, batch.operation, batch.destination,
+                                       verify=app.verify_copies,
+                                       hash_cache=open_hash_cache() if app.verify_copies else None)
+        engine.progress.set_totals(batch.steps, 0)
+        start_transfer(app, engine, on_done=lambda: resume_interrupted_operations(app))
+    else:
+        journal.finish(batch.id, BATCH_ABANDONED)
+        journal.close()
+        resume_interrupted_operations(app)
+
+def show_transfer_progress(window, snapshot):
+    """Show file counts, throughput and the estimated time left of a transfer."""
+    window.label.config(text=f"Processing files... ({snapshot.files_done}/{snapshot.files_total})")
+    if snapshot.bytes_total:
+        window.progressbar['value'] = snapshot.bytes_done / snapshot.bytes_total * 100
+    elif snapshot.files_total:
+        window.progressbar['value'] = snapshot.files_done / snapshot.files_total * 100
+    rate = f"{snapshot.files_per_second:.0f} files/s"
+    if snapshot.bytes_total:
+        rate += f" - {format_size(snapshot.bytes_per_second)}/s"
+    window.rate_label.config(text=f"{rate} - ETA {format_duration(snapshot.eta)}")
+    if snapshot.current_file:
+        window.file_label.config(text=f"Current file: {os.path.basename(snapshot.current_file)}")
+
+def create_progress_window(parent, total_files, on_cancel=None):
+    """
+    Create a modal progress window for a file operation.
 
-        shutil.move(file_path, destination_path)
-    except Exception as e:
-        logging.error(f"Error moving file {file_path} to {destination}: {e}")
+    Parameters:
+    parent (tk.Widget): The window owning the progress window.
+    total_files (int): Number of files in the operation.
+    on_cancel (callable): Called once when the user cancels; without it the
+        operation cannot be cancelled.
 
-def handle_existing_file(destination_path: str) -> str:
-    """
-    Handle file name conflicts by creating a unique filename.
-    
-    Args:
-        destination_path: Original destination path
-        
     Returns:
-        str: New unique destination path
+    tk.Toplevel: The window, with label, progressbar, rate_label and file_label.
     """
-    path = Path(destination_path)
-    creation_time = datetime.fromtimestamp(path.stat().st_ctime)
-    timestamp = creation_time.strftime('%Y%m%d_%H%M%S')
+    progress = tk.Toplevel(parent)
+    progress.title("Operation Progress")
+    progress.geometry("400x220")
+    progress.transient(parent)
+    progress.grab_set()  # Make window modal
     
-    new_path = path.parent / f"{path.stem}_{timestamp}{path.suffix}"
-    counter = 1
+    progress.label = tk.Label(progress, text="Processing files...")
+    progress.label.pack(pady=10)
     
-    while new_path.exists():
-        new_path = path.parent / f"{path.stem}_{timestamp}_{counter}{path.suffix}"
-        counter += 1
-        
-    return str(new_path)
+    progress.progressbar = ttk.Progressbar(progress, length=300, mode='determinate')
+    progress.progressbar.pack(pady=10)
 
-def delete_file(file_path):
-    """
-    Delete the specified file.
+    progress.rate_label = tk.Label(progress, text="")
+    progress.rate_label.pack()
+    
+    progress.file_label = tk.Label(progress, text="", wraplength=380)
+    progress.file_label.pack(pady=5)
 
-    Parameters:
-    file_path (str): The path of the file to delete.
-    """
-    try:
-        os.remove(file_path)
-    except Exception as e:
-        logging.error(f"Error deleting file {file_path}: {e}")
+    def cancel():
+        if on_cancel is None or str(progress.cancel_button['state']) == 'disabled':
+            return
+        progress.cancel_button.config(text="Cancelling...", state="disabled")
+        on_cancel()
+
+    progress.cancel_button = tk.Button(progress, text="Cancel", command=cancel,
+                                       state="normal" if on_cancel else "disabled")
+    progress.cancel_button.pack(pady=5)
+    progress.protocol("WM_DELETE_WINDOW", cancel)
+    
+    return progress
 
 def is_match(file: str, target: str, extensions: Set[str], exact_match: bool, case_sensitive: bool) -> bool:
     """
@@ -0,0 +1,144 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+# xxHash is much faster than BLAKE2 on large files, but optional
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
+
+# Digests live next to the search indexes so they survive between sessions
+HASH_CACHE_PATH = Path.home() / ".swiftexplorer" / "hashes.sqlite"
+
+# Files are hashed in chunks of this many bytes
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+# New digests are written to disk at most this often, in seconds
+HASH_CACHE_FLUSH_INTERVAL = 1.0
+
+HASH_ALGORITHM = "xxh3_128" if xxhash is not None else "blake2b"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    digest TEXT NOT NULL
+);
+"""
+
+def new_hasher():
+    """Create a hash object of HASH_ALGORITHM."""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+def file_digest(path: str, stop_event=None) -> Optional[str]:
+    """
+    Hash a file's contents in chunks.
+
+    Args:
+        path: File to hash
+        stop_event: Optional threading.Event that aborts hashing when set
+
+    Returns:
+        Optional[str]: Hex digest, or None if hashing was aborted
+    """
+    hasher = new_hasher()
+    with open(path, 'rb') as f:
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+class HashCache:
+    """
+    Persistent cache of file digests.
+
+    A digest is reused while the file's path, size, mtime and inode are all
+    unchanged, so verifying the same archive again only hashes what changed.
+    The cache is shared by worker threads; new digests are buffered and
+    written in one transaction at most every HASH_CACHE_FLUSH_INTERVAL seconds.
+    """
+
+    def __init__(self, path: Path = HASH_CACHE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.pending = {}
+        self.last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Write buffered digests and close the database."""
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def digest(self, path: str, stop_event=None) -> Optional[str]:
+        """
+        Get a file's digest, hashing it only if it changed since it was cached.
+
+        Args:
+            path: File to hash
+            stop_event: Optional threading.Event that aborts hashing when set
+
+        Returns:
+            Optional[str]: Hex digest, or None if hashing was aborted
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = (st.st_size, st.st_mtime_ns, st.st_ino, HASH_ALGORITHM)
+        with self.lock:
+            row = self.pending.get(path)
+            if row is None:
+                row = self.conn.execute(
+                    "SELECT path, size, mtime_ns, inode, algorithm, digest FROM hashes WHERE path = ?", (path,)
+                ).fetchone()
+        if row is not None and tuple(row[1:5]) == key:
+            return row[5]
+
+        digest = file_digest(path, stop_event)
+        # A file written to while it was hashed is not cached
+        if digest is not None and os.stat(path).st_mtime_ns == st.st_mtime_ns:
+            self.store(path, st, digest)
+        return digest
+
+    def store(self, path: str, st: os.stat_result, digest: str) -> None:
+        """Remember the digest of a file as of the given stat result."""
+        with self.lock:
+            path = os.path.abspath(path)
+            self.pending[path] = (path, st.st_size, st.st_mtime_ns, st.st_ino, HASH_ALGORITHM, digest)
+            if time.monotonic() - self.last_flush < HASH_CACHE_FLUSH_INTERVAL:
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Write buffered digests in a single transaction."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+            if pending:
+                with self.conn:
+                    self.conn.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                                          pending.values())
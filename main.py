@@ -1,20 +1,19 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
-import ttkbootstrap as tb
-from ui import FolderBrowser
+import sys
 import json
+import logging
 from pathlib import Path
 from typing import Dict, Any
-import logging
-import PIL
-from PIL import Image
+from utils import StartupTimer
 
-# Monkey-patch: allow calls to Image.CUBIC by mapping it to BICUBIC
-if not hasattr(Image, "CUBIC"):
-    Image.CUBIC = Image.BICUBIC
+# The GUI toolkit, the UI and Pillow are imported under the __main__ guard
+# below: content search workers are spawned processes that re-run this
+# module as __mp_main__, and must not pay for a GUI they never show
 
 CONFIG_FILE = Path("config.json")
 
+# Pass this flag to print how long each startup phase took
+STARTUP_REPORT_FLAG = "--startup-report"
+
 def load_config() -> Dict[str, Any]:
     """Load application configuration."""
     try:
@@ -37,12 +36,14 @@ def main() -> None:
     """Initialize and run the application with modern styling"""
     try:
         config = load_config()
+        startup_timer.mark("config")
         
         # Create root window with modern styling
         root = tb.Window(
             themename=config["theme"],
             scaling=1.2  # Increase default size of widgets
         )
+        startup_timer.mark("window")
         
         # Configure window
         root.title("SwiftExplorer")
@@ -60,6 +61,10 @@ def main() -> None:
         
         # Add theme toggle with modern styling
         create_theme_toggle(root, config)
+        startup_timer.mark("ui")
+
+        # The first idle callback runs once the window has been drawn
+        root.after_idle(report_startup)
         
         root.mainloop()
 
@@ -67,7 +72,13 @@ def main() -> None:
         logging.exception("Application error")
         messagebox.showerror("Error", f"Application error: {str(e)}")
 
-def create_theme_toggle(root: tb.Window, config: Dict[str, Any]) -> None:
+def report_startup() -> None:
+    """Record the first idle moment and print the startup report if requested."""
+    startup_timer.mark("first draw")
+    if STARTUP_REPORT_FLAG in sys.argv[1:]:
+        print(startup_timer.report(), file=sys.stderr)
+
+def create_theme_toggle(root: "tb.Window", config: Dict[str, Any]) -> None:
     """Create modern theme toggle"""
     toggle_frame = ttk.Frame(root)
     toggle_frame.pack(side=tk.BOTTOM, pady=10)
@@ -84,7 +95,7 @@ def create_theme_toggle(root: tb.Window, config: Dict[str, Any]) -> None:
     )
     dark_mode_toggle.pack(side=tk.LEFT, padx=5)
 
-def toggle_dark_mode(root: tb.Window, var: tk.BooleanVar, config: Dict[str, Any]) -> None:
+def toggle_dark_mode(root: "tb.Window", var: "tk.BooleanVar", config: Dict[str, Any]) -> None:
     """Toggle dark mode and save preference."""
     theme = "cyborg" if var.get() else "flatly"
     root.style.theme_use(theme)
@@ -110,4 +121,19 @@ def toggle_dark_mode(root: tb.Window, var: tk.BooleanVar, config: Dict[str, Any]
         )
 
 if __name__ == "__main__":
+    # Started before the heavy imports so the report covers them
+    startup_timer = StartupTimer()
+
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+    import ttkbootstrap as tb
+    from ui import FolderBrowser
+    from PIL import Image  # Already loaded by ttkbootstrap, which needs the patch below
+
+    startup_timer.mark("imports")
+
+    # Monkey-patch: allow calls to Image.CUBIC by mapping it to BICUBIC
+    if not hasattr(Image, "CUBIC"):
+        Image.CUBIC = Image.BICUBIC
+
     main()
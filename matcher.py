@@ -0,0 +1,269 @@
+import os
+import re
+import math
+import fnmatch
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Set
+
+# Below this many targets a plain substring loop beats walking the automaton;
+# on 100k filenames the loop was still 2x faster at 16 targets and the two
+# crossed between 48 and 64
+AUTOMATON_MIN_TARGETS = 64
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton for finding many substrings in one pass.
+
+    Matching a text costs O(len(text) + matches) no matter how many
+    patterns the automaton was built from.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[tuple] = [()]
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                    self.goto[state][ch] = next_state
+                state = next_state
+            self.out[state] += (index,)
+
+        # Breadth-first pass to compute failure links and merged outputs
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.out[next_state] += self.out[self.fail[next_state]]
+
+    def search(self, text: str) -> Set[int]:
+        """
+        Find which patterns occur in the text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Set[int]: Indices of the patterns found in the text
+        """
+        goto, fail, out = self.goto, self.fail, self.out
+        found: Set[int] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+class FilenameMatcher:
+    """
+    Match filenames against every search target in a single step.
+
+    Built once per search. Exact mode uses a hash lookup that covers the
+    same extension variants as is_match; substring mode uses an Aho-Corasick
+    automaton over the filename stem.
+    """
+
+    def __init__(self, targets: Iterable[str], extensions: Iterable[str],
+                 exact_match: bool, case_sensitive: bool):
+        # Duplicates would only produce duplicate results
+        self.targets: List[str] = list(dict.fromkeys(targets))
+        self.exact_match = exact_match
+        self.case_sensitive = case_sensitive
+
+        keys = [self._normalize(target) for target in self.targets]
+        self.exact_keys: Dict[str, List[int]] = {}
+        self.stem_keys: Dict[str, List[int]] = {}
+        self.automaton = None
+        self.substrings = keys
+
+        if exact_match:
+            extensions = [self._normalize(ext) for ext in extensions]
+            for index, key in enumerate(keys):
+                self.stem_keys.setdefault(key, []).append(index)
+                for variant in [key] + [f"{key}{ext}" for ext in extensions]:
+                    indices = self.exact_keys.setdefault(variant, [])
+                    if not indices or indices[-1] != index:
+                        indices.append(index)
+        elif len(keys) >= AUTOMATON_MIN_TARGETS:
+            self.automaton = AhoCorasick(keys)
+
+    def _normalize(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def match(self, filename: str) -> List[str]:
+        """
+        Get all targets the filename matches.
+
+        Args:
+            filename: Filename to check, without directory
+
+        Returns:
+            List[str]: Matching targets, in the order they were given
+        """
+        name = self._normalize(filename)
+        stem = os.path.splitext(name)[0]
+
+        if self.exact_match:
+            # file == target, file == target + own extension, or target + selected extension
+            indices = set(self.exact_keys.get(name, ()))
+            if stem != name:
+                indices.update(self.stem_keys.get(stem, ()))
+        elif self.automaton is not None:
+            indices = self.automaton.search(stem)
+        else:
+            return [target for target, key in zip(self.targets, self.substrings) if key in stem]
+
+        return [self.targets[index] for index in sorted(indices)]
+
+# Fuzzy mode allows this many edits per character of the target (difflib ratio ~0.8)
+FUZZY_TOLERANCE = 0.2
+
+# Filename match modes offered in the search options
+MATCH_MODES = ("Substring", "Glob", "Regex", "Fuzzy")
+
+class PatternMatcher:
+    """
+    Match filenames against precompiled glob or regex patterns.
+
+    Globs must match the whole filename; regexes may match anywhere in it.
+    When possible all patterns are also joined into one regex, so the
+    common case of a filename matching nothing costs a single regex call.
+    """
+
+    def __init__(self, targets: Iterable[str], glob: bool, case_sensitive: bool):
+        self.targets: List[str] = list(dict.fromkeys(targets))
+        flags = 0 if case_sensitive else re.IGNORECASE
+        # translate() only anchors the end, and patterns are tried with search()
+        sources = [r"\A" + fnmatch.translate(target) if glob else target for target in self.targets]
+        self.patterns: List[Pattern[str]] = [re.compile(source, flags) for source in sources]
+
+        # Groups would renumber backreferences once the patterns are joined
+        self.combined: Optional[Pattern[str]] = None
+        if len(self.patterns) > 1 and not any(pattern.groups for pattern in self.patterns):
+            try:
+                self.combined = re.compile("|".join(f"(?:{source})" for source in sources), flags)
+            except re.error:
+                self.combined = None  # e.g. inline flags that are only valid at the start
+
+    def match(self, filename: str) -> List[str]:
+        """
+        Get all targets whose pattern matches the filename.
+
+        Args:
+            filename: Filename to check, without directory
+
+        Returns:
+            List[str]: Matching targets, in the order they were given
+        """
+        if self.combined is not None and not self.combined.search(filename):
+            return []
+        return [target for target, pattern in zip(self.targets, self.patterns) if pattern.search(filename)]
+
+def within_edit_distance(a: str, b: str, limit: int) -> bool:
+    """
+    Check whether two strings are at most limit edits apart.
+
+    Only the diagonal band of width 2 * limit + 1 of the Levenshtein table is
+    computed, and the scan stops as soon as a whole row exceeds the limit, so
+    the cost is O(limit * len(a)) rather than O(len(a) * len(b)).
+    """
+    if abs(len(a) - len(b)) > limit:
+        return False
+    over = limit + 1  # Stands for any distance above the limit
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i, ch in enumerate(a, 1):
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        row_min = current[0]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = previous[j - 1] + (ch != b[j - 1])
+            value = min(previous[j] + 1, current[j - 1] + 1, cost, over)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return False
+        previous = current
+    return previous[len(b)] <= limit
+
+class FuzzyMatcher:
+    """
+    Match filename stems that contain a target or are within a few edits of it.
+
+    Candidates are rejected cheaply by length difference and missing
+    characters before the bounded edit distance is computed.
+    """
+
+    def __init__(self, targets: Iterable[str], case_sensitive: bool):
+        self.targets: List[str] = list(dict.fromkeys(targets))
+        self.case_sensitive = case_sensitive
+        self.keys = [self._normalize(target) for target in self.targets]
+        self.limits = [max(1, math.ceil(len(key) * FUZZY_TOLERANCE)) for key in self.keys]
+        self.charsets = [frozenset(key) for key in self.keys]
+
+    def _normalize(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def match(self, filename: str) -> List[str]:
+        """
+        Get all targets the filename stem fuzzily matches.
+
+        Args:
+            filename: Filename to check, without directory
+
+        Returns:
+            List[str]: Matching targets, in the order they were given
+        """
+        stem = os.path.splitext(self._normalize(filename))[0]
+        stem_chars = set(stem)
+        matched = []
+        for target, key, limit, charset in zip(self.targets, self.keys, self.limits, self.charsets):
+            if key in stem:
+                matched.append(target)
+            elif (abs(len(stem) - len(key)) <= limit
+                    and len(charset - stem_chars) <= limit  # Each missing character costs an edit
+                    and within_edit_distance(stem, key, limit)):
+                matched.append(target)
+        return matched
+
+def create_matcher(targets: Iterable[str], extensions: Iterable[str], mode: str,
+                   exact_match: bool, case_sensitive: bool):
+    """
+    Build the filename matcher for a search.
+
+    Args:
+        targets: Search targets, or patterns in Glob and Regex mode
+        extensions: Selected extensions, used by exact substring matching
+        mode: One of MATCH_MODES
+        exact_match: Require whole-name matches in Substring mode
+        case_sensitive: Match case exactly
+
+    Returns:
+        A matcher whose match(filename) returns the matching targets
+
+    Raises:
+        re.error: If a pattern in Regex mode is invalid
+    """
+    if mode == "Glob":
+        return PatternMatcher(targets, glob=True, case_sensitive=case_sensitive)
+    if mode == "Regex":
+        return PatternMatcher(targets, glob=False, case_sensitive=case_sensitive)
+    if mode == "Fuzzy":
+        return FuzzyMatcher(targets, case_sensitive)
+    return FilenameMatcher(targets, extensions, exact_match, case_sensitive)
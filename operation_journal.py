@@ -0,0 +1,300 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Batch owners hold an OS lock on a file, released by the OS when their process dies
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
+
+# The journal lives next to the search indexes so it survives a crash of the app
+JOURNAL_PATH = Path.home() / ".swiftexplorer" / "journal.sqlite"
+
+# Completed steps are flushed to disk at least this often, in seconds; a crash
+# loses at most this much progress, which a resume simply repeats
+JOURNAL_FLUSH_INTERVAL = 1.0
+
+# Batch states
+BATCH_RUNNING = 0
+BATCH_FINISHED = 1
+BATCH_ABANDONED = 2
+
+# Step states
+STEP_PLANNED = 0
+STEP_DONE = 1
+STEP_FAILED = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY,
+    operation TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    created REAL NOT NULL,
+    state INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    batch INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    same_device INTEGER NOT NULL,
+    state INTEGER NOT NULL,
+    error TEXT,
+    PRIMARY KEY (batch, seq)
+) WITHOUT ROWID;
+"""
+
+class JournalStep(NamedTuple):
+    """A planned step of a journaled batch."""
+    seq: int
+    source: str
+    destination: str
+    size: int
+    same_device: bool
+    state: int
+
+class BatchInfo(NamedTuple):
+    """Summary of a journaled batch."""
+    id: int
+    operation: str
+    destination: str
+    created: float
+    steps: int
+    done: int
+    failed: int
+
+def lock_file(f) -> bool:
+    """Lock an open file exclusively without waiting; False if another process holds it."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+class OperationJournal:
+    """
+    On-disk journal of batch file operations.
+
+    Every step of a batch is recorded when it is planned, and marked done or
+    failed when it finishes. A batch whose process died stays in the running
+    state, so it can be found and resumed later without repeating finished
+    steps. Step updates from worker threads are buffered and written in one
+    transaction at most every JOURNAL_FLUSH_INTERVAL seconds.
+
+    The process running a batch holds a lock file for it, so a batch that is
+    still running in another instance of the app is never taken for an
+    interrupted one.
+    """
+
+    def __init__(self, path: Path = JOURNAL_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.pending: List[Tuple[int, Optional[str], int, int]] = []
+        self.last_flush = time.monotonic()
+        self.lock_dir = path.with_suffix(".locks")
+        self.lock_dir.mkdir(exist_ok=True)
+        self.owned: Dict[int, object] = {}
+
+    def close(self) -> None:
+        """Write buffered step updates, release owned batches and close the database."""
+        self.flush()
+        for batch_id in list(self.owned):
+            self._release(batch_id, remove=False)
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def begin(self, operation: str, destination: str, steps: Iterable[Tuple[int, str, str, int, bool]]) -> int:
+        """
+        Record a new batch and all of its planned steps.
+
+        Args:
+            operation: 'copy' or 'move'
+            destination: Destination directory of the batch
+            steps: (sequence number, source, destination path, size, same device) per file
+
+        Returns:
+            int: Id of the new batch
+        """
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO batches (operation, destination, created, state) VALUES (?, ?, ?, ?)",
+                (operation, destination, time.time(), BATCH_RUNNING)
+            )
+            batch_id = cursor.lastrowid
+            # Owned before the batch is committed, so no other process sees it unowned
+            if not self._acquire(batch_id):
+                raise OSError(f"Lock of journal batch {batch_id} is held by another process")
+            self.conn.executemany(
+                "INSERT INTO steps (batch, seq, source, destination, size, same_device, state) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((batch_id, seq, source, target, size, int(same_device), STEP_PLANNED)
+                 for seq, source, target, size, same_device in steps)
+            )
+        return batch_id
+
+    def step_done(self, batch_id: int, seq: int) -> None:
+        self._record(batch_id, seq, STEP_DONE, None)
+
+    def step_failed(self, batch_id: int, seq: int, error: str) -> None:
+        self._record(batch_id, seq, STEP_FAILED, error)
+
+    def _record(self, batch_id: int, seq: int, state: int, error: Optional[str]) -> None:
+        with self.lock:
+            self.pending.append((state, error, batch_id, seq))
+            if time.monotonic() - self.last_flush < JOURNAL_FLUSH_INTERVAL:
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Write buffered step updates in a single transaction."""
+        with self.lock:
+            pending, self.pending = self.pending, []
+            self.last_flush = time.monotonic()
+            if pending:
+                with self.conn:
+                    self.conn.executemany("UPDATE steps SET state = ?, error = ? WHERE batch = ? AND seq = ?", pending)
+
+    def finish(self, batch_id: int, state: int = BATCH_FINISHED) -> None:
+        """Flush the batch's steps, mark it finished (or abandoned) and release it."""
+        self.flush()
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE batches SET state = ? WHERE id = ?", (state, batch_id))
+        with self.lock:
+            self._release(batch_id, remove=True)
+
+    def claim(self, batch_id: int) -> bool:
+        """
+        Take ownership of an interrupted batch before resuming or abandoning it.
+
+        Returns:
+            bool: False if another process owns the batch or it is no longer running
+        """
+        with self.lock:
+            if batch_id not in self.owned and not self._acquire(batch_id):
+                return False
+            row = self.conn.execute("SELECT state FROM batches WHERE id = ?", (batch_id,)).fetchone()
+            if row is None or row[0] != BATCH_RUNNING:
+                self._release(batch_id, remove=False)
+                return False
+            return True
+
+    def _lock_path(self, batch_id: int) -> Path:
+        return self.lock_dir / f"batch_{batch_id}.lock"
+
+    def _acquire(self, batch_id: int) -> bool:
+        f = open(self._lock_path(batch_id), 'a+b')
+        if not lock_file(f):
+            f.close()
+            return False
+        self.owned[batch_id] = f
+        return True
+
+    def _release(self, batch_id: int, remove: bool) -> None:
+        f = self.owned.pop(batch_id, None)
+        if f is None:
+            return
+        if remove:
+            # Removed while still locked, so no other process can lock a stale file
+            try:
+                os.remove(self._lock_path(batch_id))
+            except OSError:
+                pass
+        f.close()
+
+    def _owner_gone(self, batch_id: int) -> bool:
+        """Check whether the process that ran a batch has stopped."""
+        if batch_id in self.owned:
+            return False
+        try:
+            with open(self._lock_path(batch_id), 'a+b') as f:
+                return lock_file(f)
+        except OSError as e:
+            logging.error(f"Error checking journal batch {batch_id}: {e}")
+            return False
+
+    def steps(self, batch_id: int) -> List[JournalStep]:
+        """Get every step of a batch, in planned order."""
+        self.flush()
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT seq, source, destination, size, same_device, state FROM steps "
+                "WHERE batch = ? ORDER BY seq", (batch_id,)
+            ).fetchall()
+        return [JournalStep(seq, source, target, size, bool(same_device), state)
+                for seq, source, target, size, same_device, state in rows]
+
+    def interrupted(self) -> List[BatchInfo]:
+        """
+        Get the batches that were still running when their process stopped.
+
+        Batches still running in this or another live process are left out;
+        claim() a batch before resuming it.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT b.id, b.operation, b.destination, b.created, COUNT(s.seq), "
+                "SUM(s.state = ?), SUM(s.state = ?) "
+                "FROM batches b LEFT JOIN steps s ON s.batch = b.id "
+                "WHERE b.state = ? GROUP BY b.id ORDER BY b.id",
+                (STEP_DONE, STEP_FAILED, BATCH_RUNNING)
+            ).fetchall()
+            return [BatchInfo(batch_id, operation, destination, created, steps, done or 0, failed or 0)
+                    for batch_id, operation, destination, created, steps, done, failed in rows
+                    if self._owner_gone(batch_id)]
+
+    def prune(self) -> None:
+        """Remove finished and abandoned batches."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM steps WHERE batch IN (SELECT id FROM batches WHERE state != ?)",
+                              (BATCH_RUNNING,))
+            self.conn.execute("DELETE FROM batches WHERE state != ?", (BATCH_RUNNING,))
+
+def write_failure_report(operation: str, failures: List[Tuple[str, str]],
+                         directory: Path = JOURNAL_PATH.parent) -> Optional[str]:
+    """
+    Write the failed files of a batch to a timestamped text report.
+
+    Args:
+        operation: Name of the operation, used in the report and file name
+        failures: (path, error) of every failed file
+        directory: Directory to write the report to
+
+    Returns:
+        Optional[str]: Path of the report, or None if there were no failures
+    """
+    if not failures:
+        return None
+    directory.mkdir(parents=True, exist_ok=True)
+    report_path = directory / f"{operation}_failures_{time.strftime('%Y%m%d_%H%M%S')}.txt"
+    try:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(f"{len(failures)} file(s) failed during {operation}\n\n")
+            for path, error in failures:
+                f.write(f"{path}\n    {error}\n")
+    except OSError as e:
+        logging.error(f"Error writing failure report {report_path}: {e}")
+        return None
+    return os.fspath(report_path)
@@ -1,13 +1,12 @@
 import os
+import threading
 from tkinter import messagebox
-from PIL import Image, ImageTk, ImageEnhance, ImageFilter
 import logging
-import fitz  # PyMuPDF
-from typing import Optional, Set
+from typing import Any, NamedTuple, Optional, Set, Tuple
 from pathlib import Path
-import pygments
-from pygments.lexers import get_lexer_for_filename
-from pygments.formatters import BBCodeFormatter
+
+# Pillow, PyMuPDF and pygments are imported by the preview handlers on first
+# use, so starting the application does not pay for backends it may never need
 
 logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
 
@@ -25,20 +24,82 @@ SUPPORTED_IMAGE_FILES: Set[str] = frozenset({
 
 SUPPORTED_PDF_FILES: Set[str] = frozenset({'.pdf'})
 
+# Longer text files are previewed up to this many characters; inserting
+# megabytes into the text widget would stall the UI
+PREVIEW_TEXT_MAX_CHARS = 1_000_000
+
+# Syntax highlighting is skipped above this many characters; it costs seconds
+# per megabyte and multiplies the text to insert
+PREVIEW_HIGHLIGHT_MAX_CHARS = 200_000
+
+# PyMuPDF is not thread-safe, and previews are decoded on worker threads
+# while the Tk thread turns pages, so every call into it holds this lock
+PDF_LOCK = threading.RLock()
+
 SUPPORTED_DOCUMENT_FILES: Set[str] = frozenset({
     '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
     '.odt', '.ods', '.odp'
 })
 
+class TextPreview(NamedTuple):
+    """Decoded text, ready to insert into the text widget."""
+    content: str
+
+class ImagePreview(NamedTuple):
+    """A decoded image and a copy already fitted to the canvas."""
+    image: Any
+    fitted: Any
+
+class PdfPreview(NamedTuple):
+    """An opened PDF document and one rasterized page."""
+    doc: Any
+    page_number: int
+    page_image: Any
+
 def preview_file(app, file_path: str, page_number: int = 0) -> None:
     """
-    Preview a file based on its type.
+    Preview a file based on its type, decoding it on the calling thread.
     
     Args:
         app: Application instance
         file_path: Path to the file to preview
         page_number: Page number for PDF files
         
+    Raises:
+        FileNotFoundError: If file doesn't exist
+    """
+    if not Path(file_path).exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    try:
+        show_preview(app, decode_preview(file_path, preview_canvas_size(app), page_number))
+    except Exception as e:
+        logging.exception(f"Error previewing file {file_path}")
+        display_error(app, str(e))
+
+def preview_canvas_size(app) -> Tuple[int, int]:
+    """Get the current canvas size, forcing a layout pass if it is not mapped yet."""
+    width, height = app.canvas.winfo_width(), app.canvas.winfo_height()
+    if width <= 1 or height <= 1:
+        app.canvas.update_idletasks()
+        width, height = app.canvas.winfo_width(), app.canvas.winfo_height()
+    return width, height
+
+def decode_preview(file_path: str, canvas_size: Tuple[int, int], page_number: int = 0, stop_event=None):
+    """
+    Read and decode a file into a preview, without touching any widget.
+
+    Safe to call from a worker thread; show_preview then displays the result
+    on the Tk thread.
+
+    Args:
+        file_path: Path to the file to preview
+        canvas_size: (width, height) of the canvas images are fitted to
+        page_number: Page number for PDF files
+        stop_event: Optional threading.Event; when set, decoding stops early
+
+    Returns:
+        TextPreview, ImagePreview or PdfPreview, or None if stopped
+
     Raises:
         FileNotFoundError: If file doesn't exist
         ValueError: If file type is not supported
@@ -46,79 +107,108 @@ def preview_file(app, file_path: str, page_number: int = 0) -> None:
     path = Path(file_path)
     if not path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
-        
+
     extension = path.suffix.lower()
-    
+    if extension in SUPPORTED_TEXT_FILES:
+        return decode_text_preview(file_path, stop_event)
+    if extension in SUPPORTED_IMAGE_FILES:
+        return decode_image_preview(file_path, canvas_size)
+    if extension in SUPPORTED_PDF_FILES:
+        return decode_pdf_preview(file_path, page_number, stop_event)
     try:
-        if extension in SUPPORTED_TEXT_FILES:
-            preview_text_file(app, file_path)
-        elif extension in SUPPORTED_IMAGE_FILES:
-            preview_image_file(app, file_path)
-        elif extension in SUPPORTED_PDF_FILES:
-            preview_pdf_file(app, file_path, page_number)
-        else:
-            try:
-                preview_text_file(app, file_path)
-            except Exception:
-                raise ValueError(f"Unsupported file type: {extension}")
-    except Exception as e:
-        logging.exception(f"Error previewing file {file_path}")
-        display_error(app, str(e))
+        return decode_text_preview(file_path, stop_event)
+    except Exception:
+        raise ValueError(f"Unsupported file type: {extension}")
+
+def show_preview(app, preview) -> None:
+    """Display a decoded preview. Must run on the Tk main thread."""
+    if isinstance(preview, TextPreview):
+        show_text_preview(app, preview)
+    elif isinstance(preview, ImagePreview):
+        show_image_preview(app, preview)
+    elif isinstance(preview, PdfPreview):
+        show_pdf_preview(app, preview)
+
+def decode_text_preview(file_path, stop_event=None):
+    """Read a text file and add syntax highlighting for supported file types."""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        content = file.read(PREVIEW_TEXT_MAX_CHARS + 1)
+    truncated = len(content) > PREVIEW_TEXT_MAX_CHARS
+    content = content[:PREVIEW_TEXT_MAX_CHARS]
+    if stop_event is not None and stop_event.is_set():
+        return None
+    if len(content) > PREVIEW_HIGHLIGHT_MAX_CHARS:
+        return TextPreview(content + truncation_note(truncated))
 
-def preview_text_file(app, file_path):
-    """Enhanced text file preview with syntax highlighting."""
     try:
-        app.preview_text.config(state="normal")
-        app.preview_text.delete("1.0", "end")
-        app.preview_text.pack(fill="both", expand=True)
+        import pygments
+        from pygments.lexers import get_lexer_for_filename
+        from pygments.formatters import BBCodeFormatter
+        lexer = get_lexer_for_filename(file_path)
+        formatter = BBCodeFormatter()
+        content = pygments.highlight(content, lexer, formatter)
+    except Exception:
+        pass
 
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
+    return TextPreview(content + truncation_note(truncated))
 
-        # Add syntax highlighting for supported file types
-        try:
-            lexer = get_lexer_for_filename(file_path)
-            formatter = BBCodeFormatter()
-            highlighted = pygments.highlight(content, lexer, formatter)
-            app.preview_text.insert("end", highlighted)
-        except:
-            app.preview_text.insert("end", content)
-
-        app.preview_text.config(state="disabled")
-    except Exception as e:
-        logging.error(f"Error previewing text file: {e}")
-        display_error(app, str(e))
+def truncation_note(truncated):
+    """Note appended to a text preview that does not show the whole file."""
+    return f"\n\n... (preview truncated at {PREVIEW_TEXT_MAX_CHARS:,} characters)" if truncated else ""
 
-def preview_image_file(app, file_path):
+def show_text_preview(app, preview):
+    """Enhanced text file preview with syntax highlighting."""
+    app.preview_text.config(state="normal")
+    app.preview_text.delete("1.0", "end")
+    app.preview_text.pack(fill="both", expand=True)
+    app.preview_text.insert("end", preview.content)
+    app.preview_text.config(state="disabled")
+
+def decode_image_preview(file_path, canvas_size):
+    """Decode an image file and fit a copy of it to the canvas size."""
+    from PIL import Image
+    img = Image.open(file_path)
+    img.load()
+    return ImagePreview(img, fit_image(img, *canvas_size))
+
+def show_image_preview(app, preview):
     """
     Preview an image file in the application's canvas.
 
     Parameters:
     app (object): The application instance containing the canvas.
-    file_path (str): The path of the image file to preview.
+    preview (ImagePreview): The decoded image.
     """
     app.preview_text.pack_forget()  # Hide the text widget
-    img = Image.open(file_path)
-    app.image = img  # Store the original image
-    app.canvas.update_idletasks()  # Ensure canvas dimensions are updated
-    fit_image_to_canvas(app)
+    app.image = preview.image  # Store the original image
+    draw_fitted_image(app, preview.fitted)
     app.zoom_in_button.config(state="normal")
     app.zoom_out_button.config(state="normal")
 
-def preview_pdf_file(app, file_path, page_number):
+def decode_pdf_preview(file_path, page_number=0, stop_event=None):
+    """Open a PDF document and rasterize one page at the default zoom."""
+    import fitz  # PyMuPDF
+    with PDF_LOCK:
+        doc = fitz.open(file_path)
+        if stop_event is not None and stop_event.is_set():
+            doc.close()
+            return None
+        return PdfPreview(doc, page_number, render_pdf_page(doc, page_number, 1.0))
+
+def show_pdf_preview(app, preview):
     """
     Preview a PDF file in the application's canvas.
 
     Parameters:
     app (object): The application instance containing the canvas.
-    file_path (str): The path of the PDF file to preview.
-    page_number (int): The page number to display.
+    preview (PdfPreview): The opened document and its rasterized page.
     """
     app.preview_text.pack_forget()  # Hide the text widget
-    load_pdf(app, file_path)
-    show_pdf_page(app, page_number)
-    app.zoom_in_button.config(state="normal")
-    app.zoom_out_button.config(state="normal")
+    app.pdf_doc = preview.doc
+    app.pdf_page_number = preview.page_number
+    app.zoom_level = 1.0
+    display_image_on_canvas(app, preview.page_image)
+    update_pdf_navigation_buttons(app)
 
 def display_error(app, error):
     """
@@ -140,6 +230,7 @@ def fit_image_to_canvas(app):
     try:
         if not hasattr(app, 'image'):
             return
+        from PIL import ImageEnhance
             
         img = app.image.copy()
         
@@ -154,37 +245,41 @@ def fit_image_to_canvas(app):
             
         if hasattr(app, 'rotation'):
             img = img.rotate(app.rotation, expand=True)
-            
-        canvas_width = app.canvas.winfo_width()
-        canvas_height = app.canvas.winfo_height()
-        
-        if canvas_width <= 1 or canvas_height <= 1:
-            app.canvas.update_idletasks()
-            canvas_width = app.canvas.winfo_width()
-            canvas_height = app.canvas.winfo_height()
-            
-        img_width, img_height = img.size
-        scale_factor = min(canvas_width / img_width, canvas_height / img_height)
-        new_size = (int(img_width * scale_factor), int(img_height * scale_factor))
-        
-        try:
-            img = img.resize(new_size, Image.Resampling.LANCZOS)
-        except AttributeError:
-            # Fallback for older Pillow versions
-            img = img.resize(new_size, Image.LANCZOS)
-            
-        app.canvas_img = ImageTk.PhotoImage(img)
-        app.canvas.delete("all")
-        app.canvas.create_image(
-            canvas_width // 2, 
-            canvas_height // 2,
-            anchor="center",
-            image=app.canvas_img
-        )
-        app.canvas.config(scrollregion=app.canvas.bbox("all"))
+
+        draw_fitted_image(app, fit_image(img, *preview_canvas_size(app)))
     except Exception as e:
         logging.error(f"Error fitting image to canvas: {e}")
 
+def fit_image(img, canvas_width, canvas_height):
+    """
+    Scale an image to fit the canvas, keeping its aspect ratio.
+
+    Does not touch any widget, so it can run on a worker thread.
+    """
+    from PIL import Image
+    img_width, img_height = img.size
+    scale_factor = min(canvas_width / img_width, canvas_height / img_height)
+    new_size = (max(1, int(img_width * scale_factor)), max(1, int(img_height * scale_factor)))
+
+    try:
+        return img.resize(new_size, Image.Resampling.LANCZOS)
+    except AttributeError:
+        # Fallback for older Pillow versions
+        return img.resize(new_size, Image.LANCZOS)
+
+def draw_fitted_image(app, img):
+    """Draw an image already fitted to the canvas in the canvas center."""
+    from PIL import ImageTk
+    app.canvas_img = ImageTk.PhotoImage(img)
+    app.canvas.delete("all")
+    app.canvas.create_image(
+        app.canvas.winfo_width() // 2,
+        app.canvas.winfo_height() // 2,
+        anchor="center",
+        image=app.canvas_img
+    )
+    app.canvas.config(scrollregion=app.canvas.bbox("all"))
+
 def update_preview_image(app):
     """
     Update the preview image in the canvas based on the current zoom level.
@@ -194,6 +289,7 @@ def update_preview_image(app):
     """
     if hasattr(app, 'image'):
         try:
+            from PIL import Image, ImageTk
             img = app.image.copy()
             width, height = img.size
             new_size = int(width * app.zoom_level), int(height * app.zoom_level)
@@ -207,7 +303,7 @@ def update_preview_image(app):
             app.canvas.config(scrollregion=app.canvas.bbox("all"))
         except Exception as e:
             logging.error(f"Error updating preview image: {e}")
-    elif app.pdf_doc:
+    elif app.pdf_doc is not None:
         show_pdf_page(app, app.pdf_page_number)
 
 def load_pdf(app, file_path):
@@ -218,7 +314,9 @@ def load_pdf(app, file_path):
     app (object): The application instance containing the PDF document.
     file_path (str): The path of the PDF file to load.
     """
-    app.pdf_doc = fitz.open(file_path)
+    import fitz  # PyMuPDF
+    with PDF_LOCK:
+        app.pdf_doc = fitz.open(file_path)
     app.pdf_page_number = 0
     app.zoom_level = 1.0
     update_pdf_navigation_buttons(app)
@@ -231,17 +329,29 @@ def show_pdf_page(app, page_number):
     app (object): The application instance containing the canvas and PDF document.
     page_number (int): The page number to display.
     """
-    if app.pdf_doc:
-        page = app.pdf_doc.load_page(page_number)
-        zoom_matrix = fitz.Matrix(app.zoom_level, app.zoom_level)
-        pix = page.get_pixmap(matrix=zoom_matrix)
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    if app.pdf_doc is not None:
+        img = render_pdf_page(app.pdf_doc, page_number, app.zoom_level)
 
         app.canvas.config(scrollregion=app.canvas.bbox("all"))
         display_image_on_canvas(app, img)
 
         update_pdf_navigation_buttons(app)
 
+def render_pdf_page(doc, page_number, zoom_level):
+    """Rasterize a page of an open PDF document into a PIL image."""
+    import fitz  # PyMuPDF
+    from PIL import Image
+    with PDF_LOCK:
+        page = doc.load_page(page_number)
+        zoom_matrix = fitz.Matrix(zoom_level, zoom_level)
+        pix = page.get_pixmap(matrix=zoom_matrix)
+        return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+def pdf_page_count(doc):
+    """Get the number of pages of an open PDF document."""
+    with PDF_LOCK:
+        return len(doc)
+
 def display_image_on_canvas(app, img):
     """
     Display an image on the application's canvas.
@@ -250,6 +360,7 @@ def display_image_on_canvas(app, img):
     app (object): The application instance containing the canvas.
     img (PIL.Image): The image to display.
     """
+    from PIL import ImageTk
     app.canvas_img = ImageTk.PhotoImage(img)
     app.canvas.create_image(app.canvas.winfo_width()//2, app.canvas.winfo_height()//2, anchor="center", image=app.canvas_img)
     app.canvas.config(scrollregion=app.canvas.bbox("all"))
@@ -261,9 +372,9 @@ def update_pdf_navigation_buttons(app):
     Parameters:
     app (object): The application instance containing the navigation buttons and PDF document.
     """
-    if app.pdf_doc:
+    if app.pdf_doc is not None:
         app.prev_page_button.config(state="normal" if app.pdf_page_number > 0 else "disabled")
-        app.next_page_button.config(state="normal" if app.pdf_page_number < len(app.pdf_doc) - 1 else "disabled")
+        app.next_page_button.config(state="normal" if app.pdf_page_number < pdf_page_count(app.pdf_doc) - 1 else "disabled")
         app.zoom_in_button.config(state="normal")
         app.zoom_out_button.config(state="normal")
     else:
@@ -277,6 +388,7 @@ def apply_image_filter(app, filter_type):
     """Apply various image filters."""
     if hasattr(app, 'image'):
         try:
+            from PIL import ImageFilter
             img = app.image.copy()
             if filter_type == "grayscale":
                 img = img.convert('L')
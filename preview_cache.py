@@ -0,0 +1,114 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from preview import SUPPORTED_IMAGE_FILES, TextPreview, ImagePreview, PdfPreview
+
+# Default memory budget of decoded previews kept for re-selection
+DEFAULT_PREVIEW_CACHE_BYTES = 256 * 1024 * 1024
+
+def preview_key(path: str, canvas_size: Tuple[int, int], page_number: int = 0) -> Optional[Hashable]:
+    """
+    Build the cache key of a preview, or None if the file cannot be stat'ed.
+
+    The key holds the file's mtime and size, so a changed file never hits a
+    stale entry. Only images are fitted to the canvas, so only their keys
+    include its size.
+    """
+    path = os.path.abspath(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    fitted_to = canvas_size if Path(path).suffix.lower() in SUPPORTED_IMAGE_FILES else None
+    return (path, st.st_mtime_ns, st.st_size, fitted_to, page_number)
+
+def image_bytes(img) -> int:
+    """Approximate memory held by a decoded PIL image."""
+    return img.width * img.height * len(img.getbands())
+
+def preview_bytes(preview, file_size: int = 0) -> int:
+    """Approximate memory held by a decoded preview."""
+    if isinstance(preview, TextPreview):
+        return sys.getsizeof(preview.content)
+    if isinstance(preview, ImagePreview):
+        return image_bytes(preview.image) + image_bytes(preview.fitted)
+    if isinstance(preview, PdfPreview):
+        # The open document keeps roughly the file itself in memory
+        return image_bytes(preview.page_image) + file_size
+    return 0
+
+class PreviewCache:
+    """
+    Thread-safe LRU cache of decoded previews within a byte budget.
+
+    Entries are keyed by preview_key. Storing a preview of a file drops the
+    file's entries for any other mtime or size, and the least recently used
+    entries are evicted until the cache fits its budget.
+    """
+
+    def __init__(self, budget: int = DEFAULT_PREVIEW_CACHE_BYTES):
+        self.budget = budget
+        self.used = 0
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self.by_path: Dict[str, Set[Hashable]] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key: Optional[Hashable]):
+        """Get a cached preview and mark it recently used, or None."""
+        if key is None:
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Optional[Hashable], preview) -> None:
+        """Store a preview; previews larger than the whole budget are not kept."""
+        if key is None or preview is None:
+            return
+        cost = preview_bytes(preview, key[2])
+        if cost > self.budget:
+            return
+        path, mtime_ns, size = key[:3]
+        with self.lock:
+            for old in list(self.by_path.get(path, ())):
+                if old == key or old[1:3] != (mtime_ns, size):
+                    self._remove(old)
+            self.entries[key] = (preview, cost)
+            self.by_path.setdefault(path, set()).add(key)
+            self.used += cost
+            self._evict()
+
+    def set_budget(self, budget: int) -> None:
+        """Change the byte budget, evicting entries that no longer fit."""
+        with self.lock:
+            self.budget = budget
+            self._evict()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.by_path.clear()
+            self.used = 0
+
+    def _evict(self) -> None:
+        while self.used > self.budget and self.entries:
+            self._remove(next(iter(self.entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        _, cost = self.entries.pop(key)
+        self.used -= cost
+        keys = self.by_path[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self.by_path[key[0]]
@@ -0,0 +1,223 @@
+import logging
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+from dispatcher import UIDispatcher
+from preview import SUPPORTED_PDF_FILES, decode_preview
+from preview_cache import preview_key, preview_bytes
+
+logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
+
+# Decoding threads; a second one lets a new selection start while an
+# uninterruptible decode of the previous one is still finishing
+PREVIEW_WORKERS = 2
+
+# Delay between checks for finished previews on the main loop
+PREVIEW_DISPATCH_MS = 15
+
+# Results prefetched on each side of the selected one
+PREFETCH_NEIGHBOURS = 3
+
+# Prefetching runs on a single thread, so it takes at most one core away from
+# the preview the user is waiting for
+PREFETCH_WORKERS = 1
+
+# Files larger than this are left for an explicit selection
+PREFETCH_MAX_FILE_BYTES = 32 * 1024 * 1024
+
+# Share of the cache budget one round of prefetching may fill, so it cannot
+# evict the preview on screen or the ones just visited
+PREFETCH_CACHE_SHARE = 0.25
+
+class PreviewReadyEvent(NamedTuple):
+    """A decoded preview (or the error decoding it) for one request."""
+    request: int
+    path: str
+    preview: Any
+    error: Optional[str]
+
+class PreviewIdleEvent(NamedTuple):
+    """Posted once no decode is in flight any more."""
+
+class PreviewPipeline:
+    """
+    Decode previews on worker threads and show only the latest request.
+
+    Each request supersedes the one before it: a request that has not
+    started yet is dropped, one that is decoding is told to stop through its
+    stop event, and a result that arrives late is discarded. Finished
+    previews are handed to the show callback on the Tk main loop, which is
+    only polled while a decode is in flight.
+
+    With a PreviewCache, decoded previews are kept, and a request for a
+    cached, unchanged file is shown right away without a round trip.
+    """
+
+    def __init__(self, root, show: Callable[[str, Any, Optional[str]], None],
+                 workers: int = PREVIEW_WORKERS, cache=None):
+        self.show = show
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preview")
+        self.dispatcher = UIDispatcher(root, interval_ms=PREVIEW_DISPATCH_MS)
+        self.dispatcher.register(PreviewReadyEvent, self._deliver)
+        self.dispatcher.register(PreviewIdleEvent, self._idle)
+        self.lock = threading.Lock()
+        self.latest = 0
+        self.in_flight = 0
+        self.stop_event = threading.Event()
+        self.pending = None
+
+    def request(self, path: str, canvas_size: Tuple[int, int], page_number: int = 0) -> int:
+        """
+        Decode a file in the background, superseding any earlier request.
+
+        A preview found in the cache is shown before this returns.
+
+        Args:
+            path: File to preview
+            canvas_size: (width, height) of the canvas, read on the Tk thread
+            page_number: Page number for PDF files
+
+        Returns:
+            int: Id of the request
+        """
+        self.cancel()
+        with self.lock:
+            request_id = self.latest
+            stop_event = self.stop_event
+        key = preview_key(path, canvas_size, page_number) if self.cache is not None else None
+        cached = self.cache.get(key) if key is not None else None
+        if cached is not None:
+            self.show(path, cached, None)
+            return request_id
+        with self.lock:
+            self.in_flight += 1
+        if not self.dispatcher.running:
+            self.dispatcher.start()
+        self.pending = self.executor.submit(self._decode, request_id, path, canvas_size, page_number,
+                                            stop_event, key)
+        return request_id
+
+    def cancel(self) -> None:
+        """Drop the current request, if any; its result will not be shown."""
+        with self.lock:
+            self.latest += 1
+            self.stop_event.set()
+            self.stop_event = threading.Event()
+        if self.pending is not None:
+            if self.pending.cancel():
+                self._finished()
+            self.pending = None
+
+    def shutdown(self) -> None:
+        """Stop delivering previews and release the worker threads."""
+        self.cancel()
+        self.dispatcher.stop()
+        self.executor.shutdown(wait=False)
+
+    def _decode(self, request_id: int, path: str, canvas_size: Tuple[int, int],
+                page_number: int, stop_event: threading.Event, key) -> None:
+        try:
+            if stop_event.is_set():
+                return
+            preview, error = None, None
+            try:
+                preview = decode_preview(path, canvas_size, page_number, stop_event)
+                if self.cache is not None:
+                    # Kept even if superseded; the user may well come back to it
+                    self.cache.put(key, preview)
+            except Exception as e:
+                logging.error(f"Error previewing file {path}: {e}")
+                error = str(e)
+            if not stop_event.is_set():
+                self.dispatcher.post(PreviewReadyEvent(request_id, path, preview, error))
+        finally:
+            self._finished()
+
+    def _finished(self) -> None:
+        # Posted after the decode's own event, so the pump stops only once it was delivered
+        with self.lock:
+            self.in_flight -= 1
+            idle = self.in_flight == 0
+        if idle:
+            self.dispatcher.post(PreviewIdleEvent())
+
+    def _idle(self, event: PreviewIdleEvent) -> None:
+        with self.lock:
+            if self.in_flight == 0:
+                self.dispatcher.stop()
+
+    def _deliver(self, event: PreviewReadyEvent) -> None:
+        if event.request != self.latest:
+            return  # Superseded while it waited on the queue
+        self.show(event.path, event.preview, event.error)
+
+class PreviewPrefetcher:
+    """
+    Speculatively decode previews of neighbouring results into the cache.
+
+    Each schedule() call replaces the previous round: files still queued are
+    dropped and a decode in progress is told to stop. A round stops early
+    once its previews fill PREFETCH_CACHE_SHARE of the cache budget; files
+    that are already cached or too large are skipped. PDFs are skipped too:
+    PyMuPDF runs one call at a time, and a speculative render would hold up
+    the PDF the user actually selects.
+    """
+
+    def __init__(self, cache, workers: int = PREFETCH_WORKERS):
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.pending = []
+
+    def schedule(self, paths: List[str], canvas_size: Tuple[int, int]) -> None:
+        """
+        Start prefetching the given files, nearest first, replacing any earlier round.
+
+        Args:
+            paths: Files to prefetch, in order of priority
+            canvas_size: (width, height) of the canvas, read on the Tk thread
+        """
+        self.cancel()
+        if not paths or self.cache.budget <= 0:
+            return
+        with self.lock:
+            stop_event = self.stop_event
+        budget = [int(self.cache.budget * PREFETCH_CACHE_SHARE)]
+        self.pending = [self.executor.submit(self._prefetch, path, canvas_size, stop_event, budget)
+                        for path in paths]
+
+    def cancel(self) -> None:
+        """Drop the current round of prefetching."""
+        with self.lock:
+            self.stop_event.set()
+            self.stop_event = threading.Event()
+        for future in self.pending:
+            future.cancel()
+        self.pending = []
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self.executor.shutdown(wait=False)
+
+    def _prefetch(self, path: str, canvas_size: Tuple[int, int], stop_event: threading.Event,
+                  budget: List[int]) -> None:
+        if stop_event.is_set() or budget[0] <= 0:
+            return
+        if Path(path).suffix.lower() in SUPPORTED_PDF_FILES:
+            return
+        key = preview_key(path, canvas_size)
+        if key is None or key in self.cache or key[2] > PREFETCH_MAX_FILE_BYTES:
+            return
+        try:
+            preview = decode_preview(path, canvas_size, 0, stop_event)
+        except Exception:
+            return  # Reported when the user actually selects the file
+        if preview is None or stop_event.is_set():
+            return
+        budget[0] -= preview_bytes(preview, key[2])
+        if budget[0] >= 0:
+            self.cache.put(key, preview)
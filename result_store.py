@@ -0,0 +1,240 @@
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from itertools import zip_longest
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from scanner import FileRecord
+from content_search import ContentHit
+from utils import format_size
+
+def hit_values(hit: ContentHit) -> Tuple[str, str, str, str]:
+    """Format a content hit for display below its file in the results tree."""
+    return (f"    Line {hit.line} (byte {hit.offset})", hit.snippet, "", "")
+
+class ResultStore:
+    """
+    Compact columnar store of search results.
+
+    Rows are stored column-wise instead of as one object per file: directory
+    prefixes are interned and shared between files, sizes and mtimes live in
+    packed arrays, and display strings are only formatted for rows that are
+    actually shown. Rows are grouped by the search target they matched; in
+    grouped mode every group is shown below a header row, otherwise rows are
+    shown as one flat list. Content hits are kept only for rows that have
+    them and are shown as extra lines below their row.
+
+    Sorting reorders rows within their groups by the raw column values, using
+    a permutation per column that is cached until rows are added.
+    """
+
+    def __init__(self, grouped: bool = True):
+        self.grouped = grouped
+        self.dirs: List[str] = []
+        self.dir_index: Dict[str, int] = {}
+        self.dir_ids = array('I')
+        self.names: List[str] = []
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.targets: List[str] = []
+        self.group_rows: List[array] = []
+        self.row_groups = array('I')
+        self.group_index: Dict[str, int] = {}
+        self.hits: Dict[int, List[ContentHit]] = {}
+        self.group_hit_counts: List[int] = []
+        self._starts: Optional[List[int]] = None
+        self._row_lines: Dict[int, array] = {}
+        self._sort_orders: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __bool__(self) -> bool:
+        return bool(self.names)
+
+    def add(self, target: str, record: FileRecord, hits: Sequence[ContentHit] = ()) -> int:
+        """
+        Append a result row.
+
+        Args:
+            target: Search target the file matched
+            record: Metadata of the matching file
+            hits: Content hits of the target in the file, if any
+
+        Returns:
+            int: Row number of the new result
+        """
+        row = len(self.names)
+        # Keep the separator in the prefix so path() rebuilds the exact original path
+        prefix = record.path[:len(record.path) - len(record.name)]
+        dir_id = self.dir_index.get(prefix)
+        if dir_id is None:
+            dir_id = len(self.dirs)
+            self.dir_index[prefix] = dir_id
+            self.dirs.append(prefix)
+        self.dir_ids.append(dir_id)
+        self.names.append(record.name)
+        self.sizes.append(record.size)
+        self.mtimes.append(record.mtime)
+
+        group = self.group_index.get(target)
+        if group is None:
+            group = len(self.targets)
+            self.group_index[target] = group
+            self.targets.append(target)
+            self.group_rows.append(array('I'))
+            self.group_hit_counts.append(0)
+        self.group_rows[group].append(row)
+        self.row_groups.append(group)
+        if hits:
+            self.hits[row] = list(hits)
+            self.group_hit_counts[group] += len(hits)
+        # Every new row shifts the display lines of its group, hits or not
+        self._row_lines.pop(group, None)
+        self._starts = None
+        self._sort_orders = {}
+        return row
+
+    def path(self, row: int) -> str:
+        """Get the full path stored at a row."""
+        return self.dirs[self.dir_ids[row]] + self.names[row]
+
+    def record(self, row: int) -> FileRecord:
+        """Get the FileRecord stored at a row."""
+        return FileRecord(self.path(row), self.names[row], self.sizes[row], self.mtimes[row])
+
+    def items(self) -> Iterator[Tuple[str, List[FileRecord]]]:
+        """Iterate over (target, records) pairs, like a dict of result lists."""
+        for target, rows in zip(self.targets, self.group_rows):
+            yield target, [self.record(row) for row in rows]
+
+    def hit_items(self, target: str) -> Iterator[Tuple[int, FileRecord, List[ContentHit]]]:
+        """Iterate over the rows of a target's group with their records and content hits."""
+        for row in self.group_rows[self.group_index[target]]:
+            yield row, self.record(row), self.hits.get(row, [])
+
+    def neighbours(self, row: int, count: int) -> List[int]:
+        """
+        Get the rows around a row in display order, nearest first.
+
+        Alternates between the following and the preceding rows, up to count
+        of each, crossing into adjacent groups where a group ends.
+
+        Args:
+            row: Row to start from
+            count: Maximum number of rows taken on each side
+        """
+        group = self.row_groups[row]
+        index = self.group_rows[group].index(row)
+        after = self._walk(group, index, 1, count)
+        before = self._walk(group, index, -1, count)
+        rows = []
+        for pair in zip_longest(after, before):
+            rows.extend(r for r in pair if r is not None)
+        return rows
+
+    def _walk(self, group: int, index: int, step: int, count: int) -> List[int]:
+        """Collect up to count rows from a position in one direction of display order."""
+        rows = []
+        while len(rows) < count:
+            index += step
+            while not 0 <= index < len(self.group_rows[group]):
+                group += step
+                if not 0 <= group < len(self.group_rows):
+                    return rows
+                index = 0 if step > 0 else len(self.group_rows[group]) - 1
+            rows.append(self.group_rows[group][index])
+        return rows
+
+    def _sort_key(self, column: str):
+        if column == "Filename":
+            return lambda row: self.names[row].lower()
+        if column == "Filepath":
+            return lambda row: (self.dirs[self.dir_ids[row]].lower(), self.names[row].lower())
+        if column == "Size":
+            return self.sizes.__getitem__
+        if column == "Date Modified":
+            return self.mtimes.__getitem__
+        raise ValueError(f"Unknown sort column: {column}")
+
+    def sort(self, column: str, reverse: bool = False) -> None:
+        """
+        Reorder the rows of every group by a column.
+
+        Args:
+            column: Results tree column to sort by (Filename, Filepath, Size or Date Modified)
+            reverse: Sort in descending order
+        """
+        order = self._sort_orders.get(column)
+        if order is None:
+            order = array('I', sorted(range(len(self.names)), key=self._sort_key(column)))
+            self._sort_orders[column] = order
+
+        group_rows = [array('I') for _ in self.group_rows]
+        row_groups = self.row_groups
+        for row in (reversed(order) if reverse else order):
+            group_rows[row_groups[row]].append(row)
+        self.group_rows = group_rows
+        self._row_lines = {}
+
+    def values(self, row: int) -> Tuple[str, str, str, str]:
+        """Format a row for display in the results tree."""
+        date_modified = datetime.fromtimestamp(self.mtimes[row]).strftime('%Y-%m-%d %H:%M:%S')
+        return (self.names[row], self.path(row), format_size(self.sizes[row]), date_modified)
+
+    def _group_starts(self) -> List[int]:
+        # Display position of each group's first line, rebuilt after rows were added
+        if self._starts is None:
+            starts = []
+            position = 0
+            header = 1 if self.grouped else 0
+            for rows in self.group_rows:
+                starts.append(position)
+                position += len(rows) + self.group_hit_counts[len(starts) - 1] + header
+            starts.append(position)
+            self._starts = starts
+        return self._starts
+
+    def display_length(self) -> int:
+        """Number of display lines, including group headers and content hits."""
+        return self._group_starts()[-1]
+
+    def _group_row_lines(self, group: int) -> array:
+        # First display line of each row within a group that has content hits
+        lines = self._row_lines.get(group)
+        if lines is None:
+            lines = array('I')
+            line = 0
+            for row in self.group_rows[group]:
+                lines.append(line)
+                line += 1 + len(self.hits.get(row, ()))
+            self._row_lines[group] = lines
+        return lines
+
+    def locate(self, position: int) -> Tuple[int, Optional[int], int, Optional[ContentHit]]:
+        """
+        Find what is shown at a display position.
+
+        Args:
+            position: Line number in the display, 0-based
+
+        Returns:
+            Tuple[int, Optional[int], int, Optional[ContentHit]]: Group number,
+            row number (None for a group header), the row's index within its
+            group and the content hit shown (None for the row itself)
+        """
+        starts = self._group_starts()
+        group = bisect_right(starts, position) - 1
+        line = position - starts[group]
+        if self.grouped:
+            if line == 0:
+                return group, None, 0, None
+            line -= 1
+        if not self.group_hit_counts[group]:
+            return group, self.group_rows[group][line], line, None
+
+        lines = self._group_row_lines(group)
+        index = bisect_right(lines, line) - 1
+        row = self.group_rows[group][index]
+        offset = line - lines[index]
+        return group, row, index, self.hits[row][offset - 1] if offset else None
@@ -0,0 +1,189 @@
+from typing import Dict, List, Optional, Set
+
+from result_store import ResultStore, hit_values
+
+# Result count above which the results tree switches to the virtual list
+VIRTUAL_THRESHOLD = 5000
+
+# Rows scrolled per mouse wheel step
+WHEEL_ROWS = 3
+
+# Modifier bits of Tk event.state for Shift and Control
+SHIFT_MASK = 0x0001
+CONTROL_MASK = 0x0004
+
+class VirtualResultsView:
+    """
+    Virtual list mode for the results Treeview.
+
+    Results stay in a ResultStore and only the rows that fit in the widget are
+    materialized as Treeview items; scrolling re-renders that window. Selection
+    is tracked by store row, so it survives rows scrolling out of view.
+    """
+
+    def __init__(self, tree, scrollbar, row_height: int = 30):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_height = row_height
+        self.store: Optional[ResultStore] = None
+        self.active = False
+        self.offset = 0
+        self.selected_rows: Set[int] = set()
+        self.item_rows: Dict[str, Optional[int]] = {}
+
+        # Handlers are bound once and do nothing while the view is inactive
+        tree.bind('<<TreeviewSelect>>', self.on_select, add='+')
+        tree.bind('<Button-1>', self.on_click, add='+')
+        tree.bind('<Configure>', lambda e: self.render(), add='+')
+        tree.bind('<MouseWheel>', self.on_wheel, add='+')
+        tree.bind('<Button-4>', self.on_wheel, add='+')
+        tree.bind('<Button-5>', self.on_wheel, add='+')
+        tree.bind('<Up>', lambda e: self.on_arrow(e, -1))
+        tree.bind('<Down>', lambda e: self.on_arrow(e, 1))
+        tree.bind('<Prior>', lambda e: self.on_page(-1))
+        tree.bind('<Next>', lambda e: self.on_page(1))
+
+    def attach(self, store: ResultStore) -> None:
+        """Show the store in the tree, replacing any items it currently holds."""
+        self.store = store
+        self.active = True
+        self.offset = 0
+        self.selected_rows = set()
+        self.scrollbar.config(command=self.yview)
+        self.tree.configure(yscrollcommand=lambda *args: None)
+        self.render()
+
+    def detach(self) -> None:
+        """Leave virtual mode and hand scrolling back to the tree."""
+        if not self.active:
+            return
+        self.active = False
+        self.store = None
+        self.selected_rows = set()
+        self.item_rows = {}
+        self.tree.delete(*self.tree.get_children())
+        self.scrollbar.config(command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+
+    def visible_count(self) -> int:
+        """Number of rows that fit in the tree, not counting the heading."""
+        return max(1, self.tree.winfo_height() // self.row_height - 1)
+
+    def render(self) -> None:
+        """Materialize the rows of the current window as Treeview items."""
+        if not self.active:
+            return
+
+        total = self.store.display_length()
+        count = self.visible_count()
+        self.offset = max(0, min(self.offset, total - count))
+
+        self.tree.delete(*self.tree.get_children())
+        self.item_rows = {}
+        selection = []
+        for position in range(self.offset, min(total, self.offset + count)):
+            group, row, index, hit = self.store.locate(position)
+            if row is None:
+                item = self.tree.insert('', 'end', values=(self.store.targets[group], "", "", ""), tags=('parent',))
+            elif hit is not None:
+                # Hit lines are not selectable results; they stay out of item_rows
+                self.tree.insert('', 'end', values=hit_values(hit), tags=('hit',))
+                continue
+            else:
+                tag = 'evenrow' if index % 2 == 0 else 'oddrow'
+                item = self.tree.insert('', 'end', values=self.store.values(row), tags=(tag,))
+                if row in self.selected_rows:
+                    selection.append(item)
+            self.item_rows[item] = row
+        self.tree.selection_set(selection)
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + count) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, offset: int) -> None:
+        """Scroll so the given display line is the first visible one."""
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def yview(self, *args) -> None:
+        """Scrollbar command handler."""
+        if not self.active:
+            return
+        total = self.store.display_length()
+        count = self.visible_count()
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * total))
+        elif args[0] == 'scroll':
+            step = count if args[2] == 'pages' else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def on_wheel(self, event):
+        if not self.active:
+            return None
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.offset - WHEEL_ROWS)
+        else:
+            self.scroll_to(self.offset + WHEEL_ROWS)
+        return "break"
+
+    def on_page(self, direction: int):
+        if not self.active:
+            return None
+        self.scroll_to(self.offset + direction * self.visible_count())
+        return "break"
+
+    def on_arrow(self, event, direction: int):
+        """Scroll the window when the keyboard moves past its first or last row."""
+        if not self.active:
+            return None
+        children = self.tree.get_children()
+        focus = self.tree.focus()
+        if not children or focus not in children:
+            return None
+
+        index = children.index(focus)
+        at_edge = index == 0 if direction < 0 else index == len(children) - 1
+        position = self.offset + index + direction
+        if not at_edge or not 0 <= position < self.store.display_length():
+            return None  # Let the Treeview move the selection itself
+
+        if not event.state & SHIFT_MASK:
+            self.selected_rows = set()
+        self.scroll_to(self.offset + direction)
+        item = self.tree.get_children()[index]
+        row = self.item_rows.get(item)
+        if row is not None:
+            self.selected_rows.add(row)
+            self.tree.selection_set(item)
+        self.tree.focus(item)
+        return "break"
+
+    def on_click(self, event):
+        # A plain click replaces the selection, including rows scrolled out of view
+        if self.active and not event.state & (SHIFT_MASK | CONTROL_MASK):
+            self.selected_rows = set()
+
+    def on_select(self, event=None):
+        """Mirror the selection of the visible items into the selected rows."""
+        if not self.active:
+            return
+        selection = set(self.tree.selection())
+        for item, row in self.item_rows.items():
+            if row is None:
+                continue
+            if item in selection:
+                self.selected_rows.add(row)
+            else:
+                self.selected_rows.discard(row)
+
+    def select_all(self) -> None:
+        """Select every result row."""
+        self.selected_rows = set(range(len(self.store)))
+        self.render()
+
+    def selected_paths(self) -> List[str]:
+        """Paths of the selected rows, in row order."""
+        return [self.store.path(row) for row in sorted(self.selected_rows)]
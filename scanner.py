@@ -0,0 +1,207 @@
+import os
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
+
+# Directory listing is latency-bound, so use more threads than cores
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Files stat'd per task by to_records and stat_files
+STAT_BATCH_SIZE = 256
+
+class FileRecord(NamedTuple):
+    """
+    Lightweight metadata record for a single file found by a search.
+
+    Carries the stat data the results view needs, so a file is stat'd at most
+    once per search and never again for display, selection or sorting.
+    """
+    path: str
+    name: str
+    size: int
+    mtime: float
+
+    @classmethod
+    def from_entry(cls, entry: os.DirEntry) -> "FileRecord":
+        """Build a record from a DirEntry, reusing its cached stat result."""
+        st = entry.stat()
+        return cls(entry.path, entry.name, st.st_size, st.st_mtime)
+
+    @classmethod
+    def from_path(cls, path: str) -> "FileRecord":
+        """Build a record for a path that did not come from a directory scan."""
+        st = os.stat(path)
+        return cls(path, os.path.basename(path), st.st_size, st.st_mtime)
+
+def scan_files(directory: str, stop_event=None) -> Iterator[os.DirEntry]:
+    """
+    Walk a directory tree with os.scandir and yield an entry per file.
+
+    Entry types come from the directory listing itself, so no stat call is made
+    while walking. Symlinked directories are not followed, matching os.walk.
+
+    Args:
+        directory: Root directory to walk
+        stop_event: Optional threading.Event that stops the walk when set
+
+    Yields:
+        os.DirEntry: Entry for every non-directory below the root
+    """
+    stack = [os.fspath(directory)]
+    while stack:
+        if stop_event is not None and stop_event.is_set():
+            return
+        files, subdirs = _list_directory(stack.pop())
+        # Reversed so subdirectories are visited in listing order, like os.walk
+        stack.extend(reversed(subdirs))
+        yield from files
+
+def _list_directory(path: str) -> Tuple[List[os.DirEntry], List[str]]:
+    """List one directory into its file entries and subdirectory paths."""
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                else:
+                    files.append(entry)
+    except OSError as e:
+        logging.error(f"Error scanning directory {path}: {e}")
+    return files, subdirs
+
+def scan_files_parallel(directory: str, stop_event=None,
+                        workers: int = DEFAULT_SCAN_WORKERS) -> Iterator[os.DirEntry]:
+    """
+    Walk a directory tree with a pool of threads listing directories.
+
+    The directories next in line are listed concurrently, while entries are
+    yielded in exactly the same order as scan_files, so results stay
+    deterministic regardless of which thread finishes first.
+
+    Args:
+        directory: Root directory to walk
+        stop_event: Optional threading.Event that stops the walk when set
+        workers: Number of listing threads; 1 falls back to scan_files
+
+    Yields:
+        os.DirEntry: Entry for every non-directory below the root
+    """
+    if workers <= 1:
+        yield from scan_files(directory, stop_event)
+        return
+
+    # Only the directories about to be consumed are listed ahead, which keeps
+    # every thread busy without holding the whole tree in memory
+    lookahead = workers * 4
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan") as executor:
+        stack: List[Union[str, Future]] = [os.fspath(directory)]
+        try:
+            while stack:
+                if stop_event is not None and stop_event.is_set():
+                    return
+                for i in range(len(stack) - 1, max(-1, len(stack) - 1 - lookahead), -1):
+                    if isinstance(stack[i], str):
+                        stack[i] = executor.submit(_list_directory, stack[i])
+                files, subdirs = stack.pop().result()
+                # Reversed so subdirectories are consumed in listing order
+                stack.extend(reversed(subdirs))
+                yield from files
+        finally:
+            for item in stack:
+                if isinstance(item, Future):
+                    item.cancel()
+
+def to_record(item: Union[os.DirEntry, FileRecord], restat: bool = False) -> Optional[FileRecord]:
+    """
+    Convert a scanned entry into a FileRecord.
+
+    Args:
+        item: DirEntry from scan_files or an already built FileRecord
+        restat: Stat an already built FileRecord again, e.g. one read from the file index
+
+    Returns:
+        Optional[FileRecord]: The record, or None if the file could not be stat'd
+    """
+    try:
+        if isinstance(item, FileRecord):
+            return FileRecord.from_path(item.path) if restat else item
+        return FileRecord.from_entry(item)
+    except OSError as e:
+        logging.error(f"Error reading file metadata {item.path}: {e}")
+        return None
+
+def _record_batch(items: List[Union[os.DirEntry, FileRecord]], restat: bool = False) -> List[Optional[FileRecord]]:
+    return [to_record(item, restat) for item in items]
+
+def to_records(items: Sequence[Union[os.DirEntry, FileRecord]],
+               workers: int = DEFAULT_SCAN_WORKERS, restat: bool = False) -> List[Optional[FileRecord]]:
+    """
+    Convert many scanned entries into FileRecords, stat'ing them in parallel batches.
+
+    Args:
+        items: DirEntries from scan_files or already built FileRecords
+        workers: Number of stat threads
+        restat: Stat already built FileRecords again
+
+    Returns:
+        List[Optional[FileRecord]]: A record per item, None where the stat failed
+    """
+    if workers <= 1 or len(items) <= STAT_BATCH_SIZE:
+        return _record_batch(list(items), restat)
+    batches = [items[i:i + STAT_BATCH_SIZE] for i in range(0, len(items), STAT_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stat") as executor:
+        return [record for records in executor.map(_record_batch, batches, [restat] * len(batches)) for record in records]
+
+def _stat_batch(paths: List[str]) -> List[Optional[FileRecord]]:
+    records = []
+    for path in paths:
+        try:
+            records.append(FileRecord.from_path(path))
+        except OSError:
+            records.append(None)  # Removed since it was listed
+    return records
+
+def stat_files(paths: Iterable[str], stop_event=None,
+               workers: int = DEFAULT_SCAN_WORKERS) -> Iterator[FileRecord]:
+    """
+    Stat many files on a pool of threads, in batches.
+
+    Args:
+        paths: Paths to stat
+        stop_event: Optional threading.Event that stops the pass when set
+        workers: Number of stat threads
+
+    Yields:
+        FileRecord: Fresh record for every path that still exists, in input order
+    """
+    paths = iter(paths)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="stat") as executor:
+        pending: List[Future] = []
+        try:
+            while True:
+                # Keep a bounded number of batches in flight
+                while len(pending) < workers * 2:
+                    batch = list(islice(paths, STAT_BATCH_SIZE))
+                    if not batch:
+                        break
+                    pending.append(executor.submit(_stat_batch, batch))
+                if not pending:
+                    return
+                if stop_event is not None and stop_event.is_set():
+                    return
+                for record in pending.pop(0).result():
+                    if record is not None:
+                        yield record
+        finally:
+            for future in pending:
+                future.cancel()
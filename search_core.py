@@ -0,0 +1,250 @@
+import os
+import re
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Set
+
+from search_index import FileIndex, caller_path
+from content_index import ContentIndex
+from scanner import FileRecord, scan_files_parallel, stat_files, to_record, to_records
+from matcher import create_matcher
+from result_store import ResultStore
+from content_search import DEFAULT_MAX_HITS, ContentSearcher
+from dispatcher import ProgressEvent, ResultBatchEvent, ErrorEvent, DoneEvent
+
+logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
+
+# Matches per result batch and seconds between progress updates from the search worker
+RESULT_BATCH_SIZE = 500
+PROGRESS_INTERVAL = 0.1
+
+class SearchOptions(NamedTuple):
+    """Search parameters, read from the UI or the command line before a search starts."""
+    directory: str
+    filenames: List[str]
+    extensions: List[str]
+    exact_match: bool
+    case_sensitive: bool
+    search_content: bool
+    search_type: str
+    use_index: bool
+    scan_workers: int
+    max_hits: int = DEFAULT_MAX_HITS
+    match_mode: str = "Substring"
+
+def search_files(options: SearchOptions, dispatcher, stop_event) -> None:
+    """
+    Search for files in the specified directory. Runs on a worker thread.
+
+    Never touches Tk widgets; matches, progress, errors and completion are
+    posted to the dispatcher, which applies them on the main loop or, for
+    the command line, writes them out.
+
+    Args:
+        options: Search parameters
+        dispatcher: Channel to post events to
+        stop_event: threading.Event that stops the search when set
+    """
+    found_files = None
+    try:
+        directory = Path(options.directory)
+        if not options.directory:
+            dispatcher.post(ErrorEvent("Please select a directory"))
+            return
+
+        if not directory.exists():
+            dispatcher.post(ErrorEvent("Directory does not exist"))
+            return
+
+        filenames = options.filenames
+        if not filenames:
+            dispatcher.post(ErrorEvent("Please enter filenames"))
+            return
+
+        # Matches are streamed to the UI as they are found when every match is shown;
+        # the other search types need the full result set before they can pick
+        stream_results = options.search_type == "All"
+        if not stream_results:
+            found_files = ResultStore()
+
+        logging.info(f"Searching in directory: {directory}")
+        logging.info(f"Searching for files: {filenames}")
+
+        # Optimize search with set for O(1) lookups
+        extensions = options.extensions
+        extension_set: Set[str] = set(extensions)
+
+        # Compile all targets once so each file is matched in a single step
+        try:
+            matcher = create_matcher(filenames, extension_set, options.match_mode,
+                                     options.exact_match, options.case_sensitive)
+        except re.error as e:
+            dispatcher.post(ErrorEvent(f"Invalid pattern: {e}"))
+            return
+        
+        # Use generator to reduce memory usage
+        def file_generator():
+            if options.use_index:
+                if options.search_content:
+                    yield from content_index_generator()
+                    return
+                yield from index_generator()
+                return
+            yield from scan_files_parallel(directory, stop_event, options.scan_workers)
+
+        def indexed_records():
+            with FileIndex(str(directory)) as index:
+                dispatcher.post(ProgressEvent(0, 0, "Refreshing index..."))
+                index.refresh(stop_event)
+                for root, file, size, mtime in index.iter_files():
+                    if stop_event.is_set():
+                        return
+                    yield FileRecord(os.path.join(root, file), file, size, mtime)
+
+        def index_generator():
+            # Indexes store absolute paths; report them in the form of the given directory
+            for record in indexed_records():
+                yield record._replace(path=caller_path(record.path, str(directory)))
+
+        def content_index_generator():
+            # Files edited in place keep their directory's mtime, so every indexed
+            # file is stat'd again before its trigrams are trusted
+            paths = (record.path for record in indexed_records())
+            records = list(stat_files(paths, stop_event, options.scan_workers))
+            if stop_event.is_set():
+                return
+            with ContentIndex(str(directory)) as content_index:
+                dispatcher.post(ProgressEvent(0, 0, "Updating content index..."))
+                content_index.update(records, stop_event)
+                if stop_event.is_set():
+                    return
+                narrowed = content_index.candidates(filenames)
+            # Only files that may contain a target are read and verified
+            for record in records:
+                if narrowed is None or record.path in narrowed:
+                    yield record._replace(path=caller_path(record.path, str(directory)))
+
+        found = 0
+        scanned = 0
+        batch = []
+        last_post = time.monotonic()
+
+        def post_progress(force: bool = False):
+            # Post progress and matches in batches at a bounded rate
+            nonlocal batch, last_post
+            now = time.monotonic()
+            if force or len(batch) >= RESULT_BATCH_SIZE or now - last_post >= PROGRESS_INTERVAL:
+                if batch:
+                    dispatcher.post(ResultBatchEvent(batch))
+                    batch = []
+                dispatcher.post(ProgressEvent(found, scanned))
+                last_post = now
+
+        def candidates():
+            nonlocal scanned
+            for item in file_generator():
+                if stop_event.is_set():
+                    return
+                scanned += 1
+                post_progress()
+                if not extensions or os.path.splitext(item.name)[1].lower() in extension_set:
+                    yield item
+
+        if options.search_content:
+            # Every candidate's content is scanned for all targets at once
+            searcher = ContentSearcher(filenames, options.case_sensitive, options.max_hits)
+
+            def content_matches():
+                for item, hits in searcher.search(((item, item.path) for item in candidates()), stop_event):
+                    by_target = {}
+                    for hit in hits:
+                        by_target.setdefault(hit.target, []).append(hit)
+                    yield item, by_target.items()
+
+            matches = content_matches()
+        else:
+            matches = ((item, [(target, ()) for target in matcher.match(item.name)]) for item in candidates())
+
+        # Matches for the non-streamed search types, stat'd together once the search is done
+        unstated = []
+
+        # The file index only notices a file edited in place on a full refresh, so
+        # indexed matches are stat'd again before their size and date are trusted;
+        # the content index path has stat'd every file already
+        restat = options.use_index and not options.search_content
+
+        for item, target_hits in matches:
+            if not stream_results:
+                target_hits = list(target_hits)
+                if target_hits:
+                    unstated.append((item, target_hits))
+                    found += len(target_hits)
+                post_progress()
+                continue
+
+            record = None
+            for target, hits in target_hits:
+                # Stat only matching files, and only once
+                record = record or to_record(item, restat)
+                if record is None:
+                    break
+                found += 1
+                batch.append((target, record, hits))
+                logging.info(f"Found match: {record.path}")
+            post_progress()
+
+        if unstated and not stop_event.is_set():
+            dispatcher.post(ProgressEvent(found, scanned, "Reading file details..."))
+            records = to_records([item for item, _ in unstated], options.scan_workers, restat)
+            for record, (_, target_hits) in zip(records, unstated):
+                if record is None:
+                    continue
+                for target, hits in target_hits:
+                    found_files.add(target, record, hits)
+            found = len(found_files)
+
+        post_progress(force=True)
+
+        logging.info(f"Total files found: {found}")
+
+    except Exception as e:
+        logging.exception("Search error")
+        dispatcher.post(ErrorEvent(f"Search error: {str(e)}"))
+    finally:
+        dispatcher.post(DoneEvent(found_files, options.search_type))
+
+def select_rows_by_type(file_paths: ResultStore, search_type: str) -> List[int]:
+    """
+    Select result rows based on the specified search type (e.g., Newest, Oldest).
+    Ensures only one version of each file is selected based on the search type.
+
+    Works on the sizes and mtimes already held by the store, so no file is
+    stat'd again.
+
+    Args:
+        file_paths: The search results
+        search_type: One of Newest, Oldest, Largest or Smallest
+
+    Returns:
+        List[int]: Rows of the selected files, in result order
+    """
+    if search_type in ("Newest", "Oldest"):
+        column = file_paths.mtimes
+    elif search_type in ("Largest", "Smallest"):
+        column = file_paths.sizes
+    else:
+        return []
+    prefer_larger = search_type in ("Newest", "Largest")
+
+    # Best row per base filename; strict comparison keeps the first of equal versions
+    best: Dict[str, int] = {}
+    for rows in file_paths.group_rows:
+        for row in rows:
+            base_name = file_paths.names[row].lower()  # Use lowercase for consistency
+            current = best.get(base_name)
+            if (current is None
+                    or (prefer_larger and column[row] > column[current])
+                    or (not prefer_larger and column[row] < column[current])):
+                best[base_name] = row
+    return list(best.values())
@@ -0,0 +1,233 @@
+import os
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
+
+# Index databases live in the user's home so they survive between sessions
+INDEX_DIR = Path.home() / ".swiftexplorer" / "index"
+
+# Stored as the mtime of a directory that could not be listed, so the next
+# refresh always lists it again
+UNSCANNED_MTIME = -1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    parent INTEGER,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    dir_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir_id ON files (dir_id);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+"""
+
+def index_path_for(root: str, index_dir: Path = INDEX_DIR) -> Path:
+    """
+    Get the database path used to index the given root directory.
+
+    Args:
+        root: Root directory of the index
+        index_dir: Directory holding the index databases
+
+    Returns:
+        Path: Location of the SQLite database for this root
+    """
+    key = os.path.normcase(os.path.abspath(root))
+    digest = hashlib.sha1(key.encode('utf-8', 'surrogateescape')).hexdigest()
+    return index_dir / f"{digest}.sqlite"
+
+def caller_path(path: str, root: str) -> str:
+    """
+    Map an indexed path, which is absolute, back to the form of the given root.
+
+    A search of a relative root then reports the same relative paths as a
+    walk of the tree would.
+
+    Args:
+        path: Path as stored in an index
+        root: Root directory as given by the caller
+
+    Returns:
+        str: The path below root as the caller wrote it
+    """
+    if os.path.isabs(root):
+        return path
+    relative = os.path.relpath(path, os.path.abspath(root))
+    return root if relative == os.curdir else os.path.join(root, relative)
+
+class FileIndex:
+    """
+    Persistent filename index for a single root directory.
+
+    Stores path, name, size and modification time of every file below the
+    root. A refresh only lists directories whose mtime changed since the
+    previous refresh, so repeated searches over a large tree skip the walk.
+    Files modified in place do not change their directory's mtime; use
+    ``refresh(full=True)`` to pick up such changes.
+    """
+
+    def __init__(self, root: str, index_dir: Path = INDEX_DIR):
+        self.root = os.path.abspath(root)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = index_path_for(self.root, index_dir)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def refresh(self, stop_event=None, full: bool = False) -> int:
+        """
+        Bring the index up to date with the file system.
+
+        A stopped refresh is rolled back, so the next refresh starts from the
+        previous complete state. A directory that cannot be listed keeps its
+        stored files and subdirectories and is listed again next time.
+
+        Args:
+            stop_event: Optional threading.Event that aborts the refresh when set
+            full: Rescan every directory regardless of its mtime
+
+        Returns:
+            int: Number of directories that were rescanned
+        """
+        known: Dict[str, Tuple[int, int]] = {}
+        children: Dict[int, List[str]] = {}
+        for dir_id, path, parent, mtime_ns in self.conn.execute(
+                "SELECT id, path, parent, mtime_ns FROM dirs"):
+            known[path] = (dir_id, mtime_ns)
+            children.setdefault(parent, []).append(path)
+
+        visited = set()
+        rescanned = 0
+        stack: List[Tuple[str, Optional[int]]] = [(self.root, None)]
+
+        completed = False
+        try:
+            while stack:
+                if stop_event is not None and stop_event.is_set():
+                    return rescanned
+
+                path, parent_id = stack.pop()
+                entry = known.get(path)
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    continue  # Removed; dropped below with its subtree
+                except OSError as e:
+                    logging.error(f"Error indexing directory {path}: {e}")
+                    self._keep_unscanned(path, parent_id, entry, children, visited, stack)
+                    continue
+
+                if entry is not None and entry[1] == mtime_ns and not full:
+                    # Unchanged directory: reuse stored files and known subdirectories
+                    dir_id = entry[0]
+                    visited.add(dir_id)
+                    stack.extend((child, dir_id) for child in children.get(dir_id, ()))
+                    continue
+
+                result = self._rescan_directory(path, parent_id, mtime_ns, entry)
+                if result is None:
+                    self._keep_unscanned(path, parent_id, entry, children, visited, stack)
+                    continue
+                dir_id, subdirs = result
+                visited.add(dir_id)
+                stack.extend((subdir, dir_id) for subdir in subdirs)
+                rescanned += 1
+
+            # Directories that were not reached any more have been removed
+            stale = [dir_id for dir_id, _ in known.values() if dir_id not in visited]
+            self._delete_directories(stale)
+            completed = True
+            return rescanned
+        finally:
+            if completed:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+
+    def _keep_unscanned(self, path, parent_id, entry, children, visited, stack) -> None:
+        """Keep a directory that could not be listed, marking it for the next refresh."""
+        if entry is None:
+            self.conn.execute(
+                "INSERT INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)",
+                (path, parent_id, UNSCANNED_MTIME)
+            )
+            return
+        dir_id = entry[0]
+        self.conn.execute("UPDATE dirs SET mtime_ns = ? WHERE id = ?", (UNSCANNED_MTIME, dir_id))
+        visited.add(dir_id)
+        stack.extend((child, dir_id) for child in children.get(dir_id, ()))
+
+    def _rescan_directory(self, path, parent_id, mtime_ns, entry) -> Optional[Tuple[int, List[str]]]:
+        """List a single directory and replace its stored file rows."""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for dir_entry in it:
+                    try:
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            subdirs.append(dir_entry.path)
+                        elif dir_entry.is_file():
+                            st = dir_entry.stat()
+                            files.append((dir_entry.name, st.st_size, st.st_mtime))
+                    except OSError as e:
+                        logging.error(f"Error indexing entry {dir_entry.path}: {e}")
+        except OSError as e:
+            logging.error(f"Error indexing directory {path}: {e}")
+            return None
+
+        if entry is None:
+            cursor = self.conn.execute(
+                "INSERT INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)",
+                (path, parent_id, mtime_ns)
+            )
+            dir_id = cursor.lastrowid
+        else:
+            dir_id = entry[0]
+            self.conn.execute("UPDATE dirs SET mtime_ns = ? WHERE id = ?", (mtime_ns, dir_id))
+            self.conn.execute("DELETE FROM files WHERE dir_id = ?", (dir_id,))
+
+        self.conn.executemany(
+            "INSERT INTO files (dir_id, name, size, mtime) VALUES (?, ?, ?, ?)",
+            [(dir_id, name, size, mtime) for name, size, mtime in files]
+        )
+        return dir_id, subdirs
+
+    def _delete_directories(self, dir_ids: List[int]) -> None:
+        """Remove directories and their files from the index."""
+        if not dir_ids:
+            return
+        rows = [(dir_id,) for dir_id in dir_ids]
+        self.conn.executemany("DELETE FROM files WHERE dir_id = ?", rows)
+        self.conn.executemany("DELETE FROM dirs WHERE id = ?", rows)
+
+    def iter_files(self) -> Iterator[Tuple[str, str, int, float]]:
+        """
+        Iterate over all indexed files.
+
+        Yields:
+            Tuple[str, str, int, float]: Directory path, filename, size and mtime
+        """
+        yield from self.conn.execute(
+            "SELECT dirs.path, files.name, files.size, files.mtime "
+            "FROM files JOIN dirs ON dirs.id = files.dir_id"
+        )
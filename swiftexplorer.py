@@ -0,0 +1,239 @@
+"""
+Headless command line interface for SwiftExplorer.
+
+Usage:
+    python -m swiftexplorer DIRECTORY [-t TARGETS_FILE] [options]
+
+Targets are read one per line from TARGETS_FILE, from --target options, or
+from stdin. Matches are streamed to stdout as JSON lines or CSV, and can be
+copied, moved or deleted afterwards. Only the GUI-free search core is
+imported, so no display is needed and startup stays fast.
+"""
+import os
+import sys
+import csv
+import json
+import argparse
+import threading
+from typing import Iterable, List, Optional, TextIO
+
+from search_core import SearchOptions, search_files, select_rows_by_type
+from scanner import DEFAULT_SCAN_WORKERS, FileRecord
+from matcher import MATCH_MODES
+from content_search import DEFAULT_MAX_HITS, ContentHit
+from dispatcher import ResultBatchEvent, ErrorEvent, DoneEvent
+from transfer_engine import TransferEngine
+from delete_engine import DeleteEngine, send2trash
+from hash_cache import HashCache
+
+SEARCH_TYPES = ("All", "Newest", "Oldest", "Largest", "Smallest")
+OUTPUT_FORMATS = ("jsonl", "csv")
+CSV_FIELDS = ("target", "path", "name", "size", "mtime", "line", "offset", "snippet")
+
+# Exit codes, following grep: matches found, nothing found, error
+EXIT_FOUND = 0
+EXIT_NOT_FOUND = 1
+EXIT_ERROR = 2
+
+class ResultWriter:
+    """Write matches to a stream as they arrive, as JSON lines or CSV."""
+
+    def __init__(self, stream: TextIO, output_format: str):
+        self.stream = stream
+        self.output_format = output_format
+        self.csv_writer = None
+        if output_format == "csv":
+            self.csv_writer = csv.writer(stream)
+            self.csv_writer.writerow(CSV_FIELDS)
+
+    def write(self, target: str, record: FileRecord, hits: Iterable[ContentHit]) -> None:
+        hits = list(hits)
+        if self.csv_writer is None:
+            self.stream.write(json.dumps({
+                "target": target,
+                "path": record.path,
+                "name": record.name,
+                "size": record.size,
+                "mtime": record.mtime,
+                "hits": [{"line": hit.line, "offset": hit.offset, "snippet": hit.snippet} for hit in hits],
+            }, ensure_ascii=False) + "\n")
+        else:
+            base = [target, record.path, record.name, record.size, record.mtime]
+            # One row per content hit, or a single row when there are none
+            for hit in hits or [None]:
+                self.csv_writer.writerow(base + ([hit.line, hit.offset, hit.snippet] if hit else ["", "", ""]))
+        self.stream.flush()
+
+class CommandLineSink:
+    """
+    Receives search events on the searching thread and writes them out.
+
+    Takes the place of the UI dispatcher: search_files only ever calls post().
+    """
+
+    def __init__(self, writer: ResultWriter, stop_event: threading.Event):
+        self.writer = writer
+        self.stop_event = stop_event
+        self.paths: List[str] = []
+        self.error: Optional[str] = None
+        self.seen = set()
+        self.output_closed = False
+
+    def post(self, event) -> None:
+        if isinstance(event, ResultBatchEvent):
+            for target, record, hits in event.results:
+                self.emit(target, record, hits)
+        elif isinstance(event, ErrorEvent):
+            self.error = event.message
+        elif isinstance(event, DoneEvent) and event.results is not None and self.error is None:
+            # Newest/Oldest/Largest/Smallest pick from the complete result set
+            store = event.results
+            for row in select_rows_by_type(store, event.search_type):
+                self.emit(store.targets[store.row_groups[row]], store.record(row), store.hits.get(row, ()))
+
+    def emit(self, target: str, record: FileRecord, hits: Iterable[ContentHit]) -> None:
+        if self.output_closed:
+            return
+        try:
+            self.writer.write(target, record, hits)
+        except BrokenPipeError:
+            # The reader went away, e.g. piped into head: stop searching quietly
+            self.output_closed = True
+            self.stop_event.set()
+            return
+        if record.path not in self.seen:
+            self.seen.add(record.path)
+            self.paths.append(record.path)
+
+def read_targets(args) -> List[str]:
+    """Collect targets from --target, the targets file, or stdin."""
+    lines = list(args.target or [])
+    if args.targets_file:
+        if args.targets_file == "-":
+            lines.extend(sys.stdin.read().splitlines())
+        else:
+            with open(args.targets_file, encoding="utf-8") as f:
+                lines.extend(f.read().splitlines())
+    elif not lines:
+        lines.extend(sys.stdin.read().splitlines())
+    return [line.strip() for line in lines if line.strip()]
+
+def apply_transfer(paths: List[str], operation: str, destination: str, verify: bool = False) -> int:
+    """Copy or move every path on the transfer engine and report the outcome to stderr."""
+    if verify:
+        with HashCache() as hash_cache:
+            progress = TransferEngine(operation, paths, destination, verify=True, hash_cache=hash_cache).run()
+    else:
+        progress = TransferEngine(operation, paths, destination).run()
+    return report_operation(operation, progress)
+
+def apply_delete(paths: List[str], use_trash: bool) -> int:
+    """Delete every path on the delete engine and report the outcome to stderr."""
+    if use_trash and send2trash is None:
+        print("error: --trash needs the Send2Trash package", file=sys.stderr)
+        return len(paths)
+    return report_operation("delete", DeleteEngine(paths, use_trash=use_trash).run())
+
+def report_operation(operation: str, progress) -> int:
+    """Print failed files and a summary to stderr; return the number of failures."""
+    snapshot = progress.snapshot()
+    if progress.error is not None:
+        print(f"{operation}: {progress.error}", file=sys.stderr)
+        return snapshot.failures + 1
+    for path, error in progress.failures:
+        print(f"{operation}: {path}: {error}", file=sys.stderr)
+    print(f"{operation}: {snapshot.files_done - snapshot.failures} of {snapshot.files_total} file(s) processed "
+          f"in {snapshot.elapsed:.1f}s", file=sys.stderr)
+    return snapshot.failures
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="swiftexplorer",
+        description="Search a directory tree for files by name or content without the GUI."
+    )
+    parser.add_argument("directory", help="Directory to search")
+    parser.add_argument("-t", "--targets-file", help="File with one target per line ('-' for stdin)")
+    parser.add_argument("--target", action="append", help="Target to search for; may be repeated")
+    parser.add_argument("-e", "--ext", action="append", default=[],
+                        help="Only search files with this extension, e.g. .py; may be repeated")
+    parser.add_argument("-m", "--mode", choices=MATCH_MODES, default="Substring", help="Filename match mode")
+    parser.add_argument("-x", "--exact", action="store_true", help="Exact filename match (Substring mode)")
+    parser.add_argument("-c", "--case-sensitive", action="store_true", help="Match case exactly")
+    parser.add_argument("--content", action="store_true", help="Search file contents instead of names")
+    parser.add_argument("--max-hits", type=int, default=DEFAULT_MAX_HITS,
+                        help="Content hits reported per file")
+    parser.add_argument("--type", choices=SEARCH_TYPES, default="All", dest="search_type",
+                        help="Report all matches or one version per filename")
+    parser.add_argument("--index", action="store_true", help="Use the on-disk filename and content index")
+    parser.add_argument("--workers", type=int, default=DEFAULT_SCAN_WORKERS, help="Directory scan threads")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="jsonl", help="Output format")
+    parser.add_argument("-o", "--output", help="Write matches to this file instead of stdout")
+    operation = parser.add_mutually_exclusive_group()
+    operation.add_argument("--copy-to", metavar="DIR", help="Copy matching files to DIR")
+    operation.add_argument("--move-to", metavar="DIR", help="Move matching files to DIR")
+    operation.add_argument("--delete", action="store_true", help="Delete matching files")
+    parser.add_argument("--trash", action="store_true", help="With --delete, move files to the trash instead")
+    parser.add_argument("--verify", action="store_true",
+                        help="Checksum every copied file against its source (with --copy-to/--move-to)")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    destination = args.copy_to or args.move_to
+    if destination and not os.path.isdir(destination):
+        print(f"error: destination does not exist: {destination}", file=sys.stderr)
+        return EXIT_ERROR
+
+    try:
+        targets = read_targets(args)
+    except OSError as e:
+        print(f"error: cannot read targets: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    options = SearchOptions(
+        directory=args.directory,
+        filenames=targets,
+        extensions=[ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in args.ext],
+        exact_match=args.exact,
+        case_sensitive=args.case_sensitive,
+        search_content=args.content,
+        search_type=args.search_type,
+        use_index=args.index,
+        scan_workers=max(1, args.workers),
+        max_hits=max(1, args.max_hits),
+        match_mode=args.mode
+    )
+
+    stream = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        sink = CommandLineSink(ResultWriter(stream, args.format), threading.Event())
+        search_files(options, sink, sink.stop_event)
+    finally:
+        if args.output:
+            stream.close()
+
+    if sink.output_closed:
+        # Keep the interpreter from failing again while flushing stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_FOUND
+    if sink.error is not None:
+        print(f"error: {sink.error}", file=sys.stderr)
+        return EXIT_ERROR
+
+    failed = 0
+    if args.copy_to:
+        failed = apply_transfer(sink.paths, "copy", args.copy_to, args.verify)
+    elif args.move_to:
+        failed = apply_transfer(sink.paths, "move", args.move_to, args.verify)
+    elif args.delete:
+        failed = apply_delete(sink.paths, args.trash)
+
+    if failed:
+        return EXIT_ERROR
+    return EXIT_FOUND if sink.paths else EXIT_NOT_FOUND
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
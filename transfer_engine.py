@@ -0,0 +1,411 @@
+import os
+import errno
+import shutil
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from operation_journal import BATCH_ABANDONED, BATCH_FINISHED, STEP_DONE
+from hash_cache import HASH_ALGORITHM, file_digest
+
+logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
+
+# Files at least this large are streamed in chunks on their own lane, so a few
+# huge files cannot hold up the many small ones
+LARGE_FILE_THRESHOLD = 64 * 1024 * 1024
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Threads copying small files, and threads streaming large ones
+DEFAULT_TRANSFER_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+LARGE_FILE_WORKERS = 2
+
+# Errors meaning a zero-copy call is not supported for this pair of files
+ZERO_COPY_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                         errno.ENOTSUP, errno.EBADF, errno.EPERM}
+
+class TransferCancelled(Exception):
+    """Raised inside a transfer when the user cancelled the operation."""
+
+class TransferTask(NamedTuple):
+    """A single planned file transfer."""
+    source: str
+    destination: str
+    size: int
+    same_device: bool = False
+    seq: int = 0
+
+class ProgressSnapshot(NamedTuple):
+    """Consistent copy of the progress counters at one moment."""
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+    failures: int
+    elapsed: float
+    current_file: str
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Estimated seconds left, from bytes when sizes are known, else from files."""
+        if self.bytes_total and self.bytes_done:
+            return (self.bytes_total - self.bytes_done) / self.bytes_per_second
+        if self.files_done:
+            return (self.files_total - self.files_done) / self.files_per_second
+        return None
+
+class TransferProgress:
+    """
+    Thread-safe progress counters shared by the transfer workers.
+
+    Workers only bump counters; whoever displays progress takes a snapshot
+    whenever it wants to repaint.
+    """
+
+    def __init__(self, files_total: int = 0, bytes_total: int = 0):
+        self.lock = threading.Lock()
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.files_done = 0
+        self.bytes_done = 0
+        self.failures: List[Tuple[str, str]] = []
+        self.error: Optional[str] = None
+        self.current_file = ""
+        self.started = time.monotonic()
+
+    def set_totals(self, files_total: int, bytes_total: int) -> None:
+        with self.lock:
+            self.files_total = files_total
+            self.bytes_total = bytes_total
+
+    def add_bytes(self, count: int) -> None:
+        with self.lock:
+            self.bytes_done += count
+
+    def file_started(self, path: str) -> None:
+        self.current_file = path
+
+    def file_done(self, path: str, error: Optional[str] = None) -> None:
+        with self.lock:
+            self.files_done += 1
+            if error is not None:
+                self.failures.append((path, error))
+
+    def batch_failed(self, error: str) -> None:
+        """Record an error that stopped the whole batch rather than one file."""
+        with self.lock:
+            self.error = error
+
+    def snapshot(self) -> ProgressSnapshot:
+        with self.lock:
+            return ProgressSnapshot(self.files_done, self.files_total, self.bytes_done,
+                                    self.bytes_total, len(self.failures),
+                                    time.monotonic() - self.started, self.current_file)
+
+def copy_file_data(source: str, destination: str, progress: Optional[TransferProgress] = None,
+                   stop_event=None) -> None:
+    """
+    Copy a file's contents in chunks, reporting bytes as they are written.
+
+    Uses os.copy_file_range or os.sendfile where the platform and file
+    systems support them, so data is copied in the kernel without passing
+    through Python, and falls back to plain reads and writes otherwise.
+    Permission bits are copied as shutil.copy does.
+
+    Args:
+        source: File to copy
+        destination: Path of the new file
+        progress: Optional counters to add copied bytes to
+        stop_event: Optional threading.Event that cancels the copy when set
+
+    Raises:
+        TransferCancelled: If stop_event was set; the partial copy is removed
+    """
+    use_copy_range = hasattr(os, "copy_file_range")
+    use_sendfile = hasattr(os, "sendfile") and os.name == "posix"
+    in_fd = os.open(source, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        out_fd = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+        try:
+            while True:
+                if stop_event is not None and stop_event.is_set():
+                    raise TransferCancelled(source)
+                if use_copy_range:
+                    try:
+                        copied = os.copy_file_range(in_fd, out_fd, COPY_CHUNK_SIZE)
+                    except OSError as e:
+                        if e.errno not in ZERO_COPY_UNSUPPORTED:
+                            raise
+                        use_copy_range = False
+                        continue
+                elif use_sendfile:
+                    try:
+                        copied = os.sendfile(out_fd, in_fd, None, COPY_CHUNK_SIZE)
+                    except OSError as e:
+                        if e.errno not in ZERO_COPY_UNSUPPORTED | {errno.ENOTSOCK}:
+                            raise
+                        use_sendfile = False
+                        continue
+                else:
+                    data = os.read(in_fd, COPY_CHUNK_SIZE)
+                    copied = len(data)
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(out_fd, view):]
+                if not copied:
+                    break
+                if progress is not None:
+                    progress.add_bytes(copied)
+        finally:
+            os.close(out_fd)
+    except TransferCancelled:
+        os.remove(destination)
+        raise
+    finally:
+        os.close(in_fd)
+    shutil.copymode(source, destination)
+
+class TransferEngine:
+    """
+    Copy or move many files into one directory on a pool of threads.
+
+    Small files are spread over a pool of workers; large files are streamed
+    in chunks on a separate, smaller pool. Destination names are assigned up
+    front so parallel workers never race for the same name. Progress is kept
+    in a TransferProgress that the caller can poll from any thread.
+
+    With an OperationJournal, the plan and every finished file are recorded
+    on disk, and an interrupted batch can be picked up again with resume().
+    With verify, every copied file is hashed and compared with its source
+    before it counts as done; a HashCache spares re-hashing unchanged sources.
+    """
+
+    def __init__(self, operation: str, sources: Sequence[str], destination: str,
+                 workers: int = DEFAULT_TRANSFER_WORKERS, stop_event=None, journal=None,
+                 verify: bool = False, hash_cache=None):
+        if operation not in ("copy", "move"):
+            raise ValueError(f"Unsupported transfer operation: {operation}")
+        self.operation = operation
+        self.sources = list(sources)
+        self.destination = destination
+        self.workers = max(1, workers)
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.progress = TransferProgress(len(self.sources))
+        self.journal = journal
+        self.batch_id: Optional[int] = None
+        self.verify = verify
+        self.hash_cache = hash_cache
+
+    @classmethod
+    def resume(cls, journal, batch_id: int, operation: str, destination: str,
+               workers: int = DEFAULT_TRANSFER_WORKERS, stop_event=None,
+               verify: bool = False, hash_cache=None) -> "TransferEngine":
+        """Create an engine that finishes an interrupted journaled batch."""
+        engine = cls(operation, [], destination, workers, stop_event, journal, verify, hash_cache)
+        engine.batch_id = batch_id
+        return engine
+
+    def plan(self) -> List[TransferTask]:
+        """
+        Stat the sources and choose a unique destination path for each.
+
+        The destination directory is listed once and every name conflict is
+        resolved against that listing, instead of probing the file system
+        per file. Each task also records whether source and destination are
+        on the same device, so a move can be a plain rename.
+        """
+        destination_device = os.stat(self.destination).st_dev
+        existing = {os.path.normcase(name) for name in os.listdir(self.destination)}
+        taken: Set[str] = set(existing)
+        tasks = []
+        for source in self.sources:
+            try:
+                st = os.stat(source)
+            except OSError as e:
+                logging.error(f"File not found: {source}")
+                self.progress.file_done(source, str(e))
+                continue
+            name = self._unique_name(os.path.basename(source), existing, taken)
+            taken.add(os.path.normcase(name))
+            tasks.append(TransferTask(source, os.path.join(self.destination, name), st.st_size,
+                                      st.st_dev == destination_device, len(tasks)))
+        return tasks
+
+    def _resume_tasks(self) -> List[TransferTask]:
+        """
+        Rebuild the unfinished tasks of a journaled batch.
+
+        Finished files count as done right away. A move whose source is gone
+        while its destination has the expected size finished after the
+        journal was last written, so it is marked done rather than retried.
+        """
+        steps = self.journal.steps(self.batch_id)
+        self.progress.set_totals(len(steps), sum(step.size for step in steps))
+        tasks = []
+        for step in steps:
+            finished = step.state == STEP_DONE
+            if not finished and self.operation == "move" and not os.path.exists(step.source):
+                try:
+                    finished = os.stat(step.destination).st_size == step.size
+                except OSError:
+                    finished = False
+                if finished:
+                    self.journal.step_done(self.batch_id, step.seq)
+            if finished:
+                self.progress.add_bytes(step.size)
+                self.progress.file_done(step.source)
+            else:
+                tasks.append(TransferTask(step.source, step.destination, step.size, step.same_device, step.seq))
+        return tasks
+
+    def _unique_name(self, name: str, existing: Set[str], taken: Set[str]) -> str:
+        """
+        Pick a free file name in the destination directory.
+
+        Names already on disk get the existing file's creation time as a
+        suffix, name_YYYYmmdd_HHMMSS.ext, as conflicts have always been
+        named; names only claimed by this batch, or still taken after that,
+        get a counter.
+        """
+        if os.path.normcase(name) not in taken:
+            return name
+        stem, ext = os.path.splitext(name)
+        if os.path.normcase(name) in existing:
+            try:
+                created = datetime.fromtimestamp(os.stat(os.path.join(self.destination, name)).st_ctime)
+            except OSError:
+                created = datetime.now()
+            stem = f"{stem}_{created.strftime('%Y%m%d_%H%M%S')}"
+            name = f"{stem}{ext}"
+        counter = 1
+        while os.path.normcase(name) in taken:
+            name = f"{stem}_{counter}{ext}"
+            counter += 1
+        return name
+
+    def run(self) -> TransferProgress:
+        """
+        Perform the transfer. Blocks until every file is done or cancelled.
+
+        An error that stops the whole batch, such as a missing destination,
+        is recorded in the progress's error rather than raised.
+
+        Returns:
+            TransferProgress: Final counters, including the failed files
+        """
+        try:
+            if self.batch_id is not None:
+                tasks = self._resume_tasks()
+            else:
+                tasks = self.plan()
+                self.progress.set_totals(self.progress.files_total, sum(task.size for task in tasks))
+                if self.journal is not None:
+                    self.batch_id = self.journal.begin(self.operation, self.destination, (
+                        (task.seq, task.source, task.destination, task.size, task.same_device) for task in tasks
+                    ))
+            # A move within one device is a rename however large the file is
+            streamed = [task.size >= LARGE_FILE_THRESHOLD and not (self.operation == "move" and task.same_device)
+                        for task in tasks]
+            small = [task for task, stream in zip(tasks, streamed) if not stream]
+            large = [task for task, stream in zip(tasks, streamed) if stream]
+
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="transfer") as small_pool, \
+                    ThreadPoolExecutor(max_workers=LARGE_FILE_WORKERS, thread_name_prefix="transfer-large") as large_pool:
+                # Large files first, so their lane starts streaming right away
+                for pool, batch in ((large_pool, large), (small_pool, small)):
+                    for task in batch:
+                        pool.submit(self._transfer, task)
+        except Exception as e:
+            logging.error(f"Error running {self.operation} to {self.destination}: {e}")
+            self.progress.batch_failed(str(e))
+
+        if self.journal is not None and self.batch_id is not None:
+            # A cancelled or failed batch is abandoned; only a crash leaves it resumable
+            abandoned = self.stop_event.is_set() or self.progress.error is not None
+            try:
+                self.journal.finish(self.batch_id, BATCH_ABANDONED if abandoned else BATCH_FINISHED)
+            except Exception as e:
+                logging.error(f"Error finishing journal batch {self.batch_id}: {e}")
+        return self.progress
+
+    def _transfer(self, task: TransferTask) -> None:
+        if self.stop_event.is_set():
+            return
+        self.progress.file_started(task.source)
+        try:
+            if self.operation == "copy":
+                self._copy(task)
+            else:
+                self._move(task)
+            self.progress.file_done(task.source)
+            if self.journal is not None:
+                self.journal.step_done(self.batch_id, task.seq)
+        except TransferCancelled:
+            pass
+        except Exception as e:
+            logging.error(f"Error during {self.operation} of {task.source} to {task.destination}: {e}")
+            self.progress.file_done(task.source, str(e))
+            if self.journal is not None:
+                self.journal.step_failed(self.batch_id, task.seq, str(e))
+
+    def _copy(self, task: TransferTask) -> None:
+        if task.size >= LARGE_FILE_THRESHOLD:
+            copy_file_data(task.source, task.destination, self.progress, self.stop_event)
+        else:
+            shutil.copy(task.source, task.destination)
+            self.progress.add_bytes(task.size)
+        if self.verify:
+            self._verify(task)
+
+    def _move(self, task: TransferTask) -> None:
+        if task.same_device:
+            try:
+                os.rename(task.source, task.destination)
+                self.progress.add_bytes(task.size)
+                return
+            except OSError as e:
+                # Different mounts of one device still refuse renames
+                if e.errno != errno.EXDEV:
+                    raise
+
+        copy_file_data(task.source, task.destination, self.progress, self.stop_event)
+        shutil.copystat(task.source, task.destination)
+        copied_size = os.stat(task.destination).st_size
+        if copied_size != task.size:
+            os.remove(task.destination)
+            raise OSError(f"Copy is {copied_size} bytes, expected {task.size}; source kept")
+        if self.verify:
+            self._verify(task)
+        os.remove(task.source)
+
+    def _verify(self, task: TransferTask) -> None:
+        """
+        Compare the digests of a copy and its source, removing a bad copy.
+
+        Raises:
+            OSError: If the digests differ
+            TransferCancelled: If the transfer was cancelled while hashing
+        """
+        if self.hash_cache is not None:
+            source_digest = self.hash_cache.digest(task.source, self.stop_event)
+        else:
+            source_digest = file_digest(task.source, self.stop_event)
+        copy_digest = file_digest(task.destination, self.stop_event)
+        if source_digest is None or copy_digest is None:
+            os.remove(task.destination)
+            raise TransferCancelled(task.source)
+        if source_digest != copy_digest:
+            os.remove(task.destination)
+            raise OSError(f"Checksum mismatch ({HASH_ALGORITHM}); copy removed")
+        if self.hash_cache is not None:
+            self.hash_cache.store(task.destination, os.stat(task.destination), copy_digest)
@@ -1,17 +1,25 @@
 from datetime import datetime
+from collections import defaultdict
 import threading
 import tkinter as tk
 import ttkbootstrap as tb
 from tkinter import filedialog, messagebox, BooleanVar
-import pyperclip
 from ttkbootstrap import ttk
 from ttkbootstrap.constants import *
-from file_operations import search_files, perform_file_operation, select_files_by_type
-from preview import preview_file, update_preview_image
+from file_operations import (search_files, get_search_options, show_error, perform_file_operation,
+                             select_rows_by_type, resume_interrupted_operations)
+from dispatcher import UIDispatcher, ProgressEvent, ResultBatchEvent, ErrorEvent, DoneEvent
+from result_store import ResultStore, hit_values
+from results_view import VirtualResultsView, VIRTUAL_THRESHOLD
+from preview import update_preview_image, show_preview, show_pdf_page, preview_canvas_size, display_error, pdf_page_count
+from preview_pipeline import PreviewPipeline, PreviewPrefetcher, PREFETCH_NEIGHBOURS
+from preview_cache import PreviewCache, DEFAULT_PREVIEW_CACHE_BYTES
+from scanner import DEFAULT_SCAN_WORKERS
+from matcher import MATCH_MODES
+from content_search import DEFAULT_MAX_HITS
 import os
 import logging
 from typing import List  # Add this import
-from ttkbootstrap.widgets import Meter  # Add this import
 
 from utils import format_size
 
@@ -29,6 +37,7 @@ class FolderBrowser:
 
         # Initialize the BooleanVar for the exact match checkbox
         self.exact_match_var = BooleanVar(value=True)
+        self.use_index_var = BooleanVar(value=False)
         self.search_jpg_var = BooleanVar(value=False)
         self.search_png_var = BooleanVar(value=False)
         self.search_gif_var = BooleanVar(value=False)
@@ -72,6 +81,14 @@ class FolderBrowser:
         # Create UI components
         self.create_main_layout(root)
 
+        # Previews are decoded in the background; only the latest selection is shown
+        self.preview_cache = PreviewCache(DEFAULT_PREVIEW_CACHE_BYTES)
+        self.preview_pipeline = PreviewPipeline(self.root, self.show_decoded_preview, cache=self.preview_cache)
+
+        # Neighbouring results are decoded ahead while the current one is on screen
+        self.preview_prefetcher = PreviewPrefetcher(self.preview_cache)
+        self.current_preview_row = None
+
         # Add keyboard shortcuts
         self.root.bind('<Control-f>', lambda e: self.file_names_text.focus())
         self.root.bind('<Control-o>', lambda e: self.browse_directory())
@@ -83,10 +100,32 @@ class FolderBrowser:
         self.search_history = []
         self.max_history = 10
 
+        # Number of threads listing directories during a search
+        self.scan_workers = DEFAULT_SCAN_WORKERS
+
+        # Content hits listed per file when searching file contents
+        self.content_max_hits = DEFAULT_MAX_HITS
+
+        # Hash every copied file and compare it with its source
+        self.verify_copies = False
+
         # Add menu bar
         self.create_menu_bar(root)
 
         self.stop_event = threading.Event()  # Event to signal stopping the search
+        self.files_found = 0
+        self.files_scanned = 0
+
+        # Search results streamed from the worker thread
+        self.search_dispatcher = None
+        self.search_failed = False
+        self.result_parents = {}
+        self.result_counts = defaultdict(int)
+        self.row_items = {}
+        self.result_store = ResultStore()
+
+        # Pick up copies and moves that an earlier session left unfinished
+        self.root.after_idle(lambda: resume_interrupted_operations(self))
 
     def configure_styles(self):
         """Configure custom styles for widgets"""
@@ -158,7 +197,7 @@ class FolderBrowser:
         """Open the settings dialog."""
         settings_dialog = tk.Toplevel(self.root)
         settings_dialog.title("Settings")
-        settings_dialog.geometry("400x400")
+        settings_dialog.geometry("400x680")
         settings_dialog.transient(self.root)
         settings_dialog.grab_set()
 
@@ -184,8 +223,34 @@ class FolderBrowser:
         history_size_spinbox = tk.Spinbox(settings_dialog, from_=1, to=100, textvariable=history_size_var, width=5)
         history_size_spinbox.pack(pady=10)
 
+        # Search threads
+        scan_workers_label = tk.Label(settings_dialog, text="Search Threads:")
+        scan_workers_label.pack(pady=10)
+        scan_workers_var = tk.IntVar(value=self.scan_workers)
+        scan_workers_spinbox = tk.Spinbox(settings_dialog, from_=1, to=64, textvariable=scan_workers_var, width=5)
+        scan_workers_spinbox.pack(pady=10)
+
+        # Content hits per file
+        max_hits_label = tk.Label(settings_dialog, text="Content Hits Per File:")
+        max_hits_label.pack(pady=10)
+        max_hits_var = tk.IntVar(value=self.content_max_hits)
+        max_hits_spinbox = tk.Spinbox(settings_dialog, from_=1, to=1000, textvariable=max_hits_var, width=5)
+        max_hits_spinbox.pack(pady=10)
+
+        # Memory kept for decoded previews
+        cache_label = tk.Label(settings_dialog, text="Preview Cache (MB):")
+        cache_label.pack(pady=10)
+        cache_mb_var = tk.IntVar(value=self.preview_cache.budget // (1024 * 1024))
+        cache_spinbox = tk.Spinbox(settings_dialog, from_=0, to=8192, textvariable=cache_mb_var, width=5)
+        cache_spinbox.pack(pady=10)
+
+        # Checksum verification of copies
+        verify_var = tk.BooleanVar(value=self.verify_copies)
+        verify_checkbox = tk.Checkbutton(settings_dialog, text="Verify Copies (checksum)", variable=verify_var)
+        verify_checkbox.pack(pady=10)
+
         # Save settings button
-        save_button = tk.Button(settings_dialog, text="Save", command=lambda: self.save_settings(theme_var.get(), default_dir_entry.get(), history_size_var.get()))
+        save_button = tk.Button(settings_dialog, text="Save", command=lambda: self.save_settings(theme_var.get(), default_dir_entry.get(), history_size_var.get(), scan_workers_var.get(), max_hits_var.get(), verify_var.get(), cache_mb_var.get()))
         save_button.pack(pady=20)
 
     def browse_default_directory(self, entry):
@@ -195,7 +260,9 @@ class FolderBrowser:
             entry.delete(0, tk.END)
             entry.insert(0, directory)
 
-    def save_settings(self, theme, default_directory, history_size):
+    def save_settings(self, theme, default_directory, history_size, scan_workers=DEFAULT_SCAN_WORKERS,
+                      content_max_hits=DEFAULT_MAX_HITS, verify_copies=False,
+                      preview_cache_mb=DEFAULT_PREVIEW_CACHE_BYTES // (1024 * 1024)):
         """Save the settings."""
         # Save the settings to a file or apply them directly
         # For simplicity, we'll just print them here
@@ -206,6 +273,10 @@ class FolderBrowser:
 
         # Apply settings
         self.max_history = history_size
+        self.scan_workers = max(1, scan_workers)
+        self.content_max_hits = max(1, content_max_hits)
+        self.verify_copies = verify_copies
+        self.preview_cache.set_budget(max(0, preview_cache_mb) * 1024 * 1024)
         self.root.style.theme_use(theme)
         self.update_status("Settings applied")
 
@@ -220,7 +291,10 @@ class FolderBrowser:
             "2. Advanced Search:\n"
             "   - Toggle 'Exact Match' for precise results\n"
             "   - Enable 'Case Sensitive' for specific matches\n"
-            "   - Select file extensions to filter results\n\n"
+            "   - Select file extensions to filter results\n"
+            "   - Pick a 'Match Mode': Substring, Glob (*.py), Regex or Fuzzy (typos)\n"
+            "   - Enable 'Use Index' to search a saved index of the directory\n"
+            "     (with 'Search Content', file contents are indexed as well)\n\n"
             "3. Search Results:\n"
             "   - Double-click to open files\n"
             "   - Select multiple files for batch operations\n"
@@ -529,6 +603,8 @@ class FolderBrowser:
         self.results_tree.heading("Filepath", text="Filepath", anchor=tk.W)
         self.results_tree.heading("Size", text="Size", anchor=tk.E)
         self.results_tree.heading("Date Modified", text="Date Modified", anchor=tk.W)
+        for col in ("Filename", "Filepath", "Size", "Date Modified"):
+            self.results_tree.heading(col, command=lambda c=col: self.sort_column(self.results_tree, c, False))
 
         # Configure column properties
         self.results_tree.column("Filename", width=200, anchor=tk.W, stretch=True)
@@ -554,6 +630,10 @@ class FolderBrowser:
             foreground='white',
             font=('Segoe UI', 10, 'bold')
         )
+        self.results_tree.tag_configure('hit',
+            background='#262626',
+            foreground='#a0a0a0'
+        )
 
         # Add scrollbar
         self.results_scrollbar = ttk.Scrollbar(parent_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
@@ -595,31 +675,40 @@ class FolderBrowser:
         )
         
         # Bind hover events
+        self.hover_item = None
+        self.hover_tags = ()
         self.results_tree.bind('<Enter>', self.on_tree_hover)
         self.results_tree.bind('<Leave>', self.on_tree_leave)
 
+        # Virtual list mode for large result sets
+        self.results_view = VirtualResultsView(self.results_tree, self.results_scrollbar, row_height=30)
+
     def on_tree_hover(self, event):
         """Handle treeview hover effect"""
+        self.on_tree_leave(event)
         item = self.results_tree.identify_row(event.y)
         if item:
+            self.hover_item = item
+            self.hover_tags = self.results_tree.item(item, 'tags')
             self.results_tree.item(item, tags=('hover',))
 
     def on_tree_leave(self, event):
         """Handle treeview hover leave"""
-        for index, item in enumerate(self.results_tree.get_children()):
-            tag = 'evenrow' if index % 2 == 0 else 'oddrow'
-            self.results_tree.item(item, tags=(tag,))
+        # Only the hovered item changed its tags, so only it needs restoring
+        if self.hover_item and self.results_tree.exists(self.hover_item):
+            self.results_tree.item(self.hover_item, tags=self.hover_tags)
+        self.hover_item = None
 
-    def insert_file_result(self, parent, file_path, index):
-        """Insert a file result into the treeview."""
+    def insert_file_result(self, parent, record, index):
+        """Insert a FileRecord into the treeview."""
         try:
-            size = format_size(os.path.getsize(file_path))
-            date_modified = datetime.fromtimestamp(os.path.getmtime(file_path)).strftime('%Y-%m-%d %H:%M:%S')
+            size = format_size(record.size)
+            date_modified = datetime.fromtimestamp(record.mtime).strftime('%Y-%m-%d %H:%M:%S')
             tag = 'evenrow' if index % 2 == 0 else 'oddrow'
             
             values = (
-                os.path.basename(file_path),  # Filename
-                file_path,                    # Full path
+                record.name,                  # Filename
+                record.path,                  # Full path
                 size,                         # File size
                 date_modified                 # Modified date
             )
@@ -636,57 +725,85 @@ class FolderBrowser:
             logging.error(f"Error inserting file result: {str(e)}")
             return None
 
+    def insert_content_hits(self, parent, hits):
+        """Insert the content hits of a file as rows below it."""
+        for hit in hits:
+            self.results_tree.insert(parent, 'end', values=hit_values(hit), tags=('hit',))
+        if hits:
+            self.results_tree.item(parent, open=True)
+
     def display_results(self, file_paths, search_type):
         """
         Display the search results in the application's results tree.
 
         Parameters:
-        file_paths (defaultdict): A dictionary of filenames and their corresponding file paths.
+        file_paths (ResultStore): The search results, grouped by target.
         search_type (str): The type of search to perform (e.g., All, Newest, Oldest).
         """
         logging.info(f"Displaying results for search type: {search_type}")
+        self.results_view.detach()
         self.results_tree.delete(*self.results_tree.get_children())
+        self.result_parents = {}
+        self.row_items = {}
 
         if search_type == "All":
+            self.result_store = file_paths
+            if len(self.result_store) > VIRTUAL_THRESHOLD:
+                self.results_view.attach(self.result_store)
+                return
+
             # Show all results grouped by target
             for target, paths in file_paths.items():
                 parent = self.results_tree.insert('', 'end', text=target, values=("", "", "", ""), tags=('parent',))
                 self.results_tree.item(parent, open=True)  # Ensure parent is expanded
-                for index, file_path in enumerate(paths):
-                    logging.info(f"Inserting file: {file_path}")
-                    self.insert_file_result(parent, file_path, index)
+                self.result_parents[target] = parent
+                for index, (row, record, hits) in enumerate(file_paths.hit_items(target)):
+                    logging.info(f"Inserting file: {record.path}")
+                    item = self.insert_file_result(parent, record, index)
+                    if item:
+                        self.row_items[row] = item
+                        self.insert_content_hits(item, hits)
         else:
             # Get unique files based on search type
-            selected_files = select_files_by_type(file_paths, search_type)
-            if not selected_files:
+            selected_rows = select_rows_by_type(file_paths, search_type)
+            if not selected_rows:
                 self.update_status("No matching files found")
                 return
 
-            # Sort results if needed
+            # Sort results if needed, on the sizes and mtimes kept by the store
             sort_by = self.sort_by_var.get()
             if sort_by == "Size":
-                selected_files.sort(key=lambda x: os.path.getsize(x))
+                selected_rows.sort(key=file_paths.sizes.__getitem__)
             elif sort_by == "Date":
-                selected_files.sort(key=os.path.getmtime)
+                selected_rows.sort(key=file_paths.mtimes.__getitem__)
 
             # Display unique results
-            for index, file_path in enumerate(selected_files):
-                self.insert_file_result('', file_path, index)
+            self.result_store = ResultStore(grouped=False)
+            for row in selected_rows:
+                self.result_store.add("", file_paths.record(row), file_paths.hits.get(row, ()))
+            if len(self.result_store) > VIRTUAL_THRESHOLD:
+                self.results_view.attach(self.result_store)
+            else:
+                for index, (row, record, hits) in enumerate(self.result_store.hit_items("")):
+                    item = self.insert_file_result('', record, index)
+                    if item:
+                        self.row_items[row] = item
+                        self.insert_content_hits(item, hits)
 
             # Update status
-            self.update_status(f"Found {len(selected_files)} file(s)")
+            self.update_status(f"Found {len(selected_rows)} file(s)")
 
     def create_file_operations_frame(self, parent_frame):
         file_ops_frame = tb.Frame(parent_frame)
         file_ops_frame.pack(fill=tk.X, pady=(10, 5))
 
-        self.copy_button = tb.Button(file_ops_frame, text="Copy Selected", command=lambda: perform_file_operation(self.results_tree, 'copy'), bootstyle=PRIMARY)
+        self.copy_button = tb.Button(file_ops_frame, text="Copy Selected", command=lambda: perform_file_operation(self, 'copy'), bootstyle=PRIMARY)
         self.copy_button.pack(side=tk.LEFT, padx=(0, 10))
         
-        self.move_button = tb.Button(file_ops_frame, text="Move Selected", command=lambda: perform_file_operation(self.results_tree, 'move'), bootstyle=PRIMARY)
+        self.move_button = tb.Button(file_ops_frame, text="Move Selected", command=lambda: perform_file_operation(self, 'move'), bootstyle=PRIMARY)
         self.move_button.pack(side=tk.LEFT, padx=(0, 10))
         
-        self.delete_button = tb.Button(file_ops_frame, text="Delete Selected", command=lambda: perform_file_operation(self.results_tree, 'delete'), bootstyle=DANGER)
+        self.delete_button = tb.Button(file_ops_frame, text="Delete Selected", command=lambda: perform_file_operation(self, 'delete'), bootstyle=DANGER)
         self.delete_button.pack(side=tk.LEFT, padx=(0, 10))
         
         # Add "Select All" button
@@ -785,6 +902,7 @@ class FolderBrowser:
     def paste_from_clipboard(self):
         """Paste and clean up clipboard content."""
         try:
+            import pyperclip  # Loaded on first paste; not needed to start up
             clipboard_content = pyperclip.paste()
             # Clean up the text by removing duplicates and empty lines
             lines = clipboard_content.strip().split('\n')
@@ -824,8 +942,30 @@ class FolderBrowser:
             self.stop_button.config(state=tk.NORMAL)
             self.loading_indicator.pack()
             self.loading_indicator.start()
-            self.stop_event.clear()  # Clear the stop event before starting the search
-            search_thread = threading.Thread(target=lambda: search_files(self))
+
+            # Clear existing results and reset the streaming state
+            self.results_view.detach()
+            self.results_tree.delete(*self.results_tree.get_children())
+            self.result_store = ResultStore(grouped=True)
+            self.selected_files = []
+            self.result_parents = {}
+            self.result_counts = defaultdict(int)
+            self.row_items = {}
+            self.search_failed = False
+
+            # Events from a previous, stopped search must not reach the new results
+            if self.search_dispatcher is not None:
+                self.search_dispatcher.stop()
+            self.search_dispatcher = self.create_search_dispatcher()
+            self.search_dispatcher.start()
+
+            options = get_search_options(self)
+            self.stop_event = threading.Event()  # Fresh event so a stopped worker stays stopped
+            search_thread = threading.Thread(
+                target=search_files,
+                args=(options, self.search_dispatcher, self.stop_event),
+                daemon=True
+            )
             search_thread.start()
         except Exception as e:
             self.update_status(f"Search error: {str(e)}")
@@ -833,6 +973,67 @@ class FolderBrowser:
             self.stop_button.config(state=tk.DISABLED)
             self.loading_indicator.pack_forget()
 
+    def create_search_dispatcher(self):
+        """Create the dispatcher that applies search worker events to the UI."""
+        dispatcher = UIDispatcher(self.root)
+        dispatcher.register(ProgressEvent, self.on_search_progress)
+        dispatcher.register(ResultBatchEvent, self.on_search_results)
+        dispatcher.register(ErrorEvent, self.on_search_error)
+        dispatcher.register(DoneEvent, self.on_search_done)
+        return dispatcher
+
+    def on_search_progress(self, event):
+        """Show the live search counters."""
+        self.status_bar.config(text=event.message or f"{event.found} found / {event.scanned} scanned")
+        self.files_found = event.found
+        self.files_scanned = event.scanned
+
+    def on_search_results(self, event):
+        """Insert a batch of streamed search results into the results tree."""
+        rows = [self.result_store.add(target, record, hits) for target, record, hits in event.results]
+
+        if self.results_view.active:
+            self.results_view.render()
+            return
+        if len(self.result_store) > VIRTUAL_THRESHOLD:
+            # Too many rows for one Treeview item each: switch to the virtual list
+            self.results_view.attach(self.result_store)
+            return
+
+        for row, (target, record, hits) in zip(rows, event.results):
+            parent = self.result_parents.get(target)
+            if parent is None:
+                parent = self.results_tree.insert('', 'end', text=target, values=("", "", "", ""), tags=('parent',))
+                self.results_tree.item(parent, open=True)
+                self.result_parents[target] = parent
+            item = self.insert_file_result(parent, record, self.result_counts[target])
+            if item:
+                self.row_items[row] = item
+                self.insert_content_hits(item, hits)
+            self.result_counts[target] += 1
+
+    def on_search_error(self, event):
+        """Report a search error to the user."""
+        self.search_failed = True
+        show_error(self, event.message)
+
+    def on_search_done(self, event):
+        """Reset the search controls and show the final results."""
+        self.search_dispatcher.stop()
+        self.search_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        self.loading_indicator.stop()
+        self.loading_indicator.pack_forget()
+        if self.search_failed:
+            return
+
+        if not self.files_found:
+            self.update_status("No files found")
+        elif event.search_type != "All":
+            self.display_results(event.results, event.search_type)
+        else:
+            self.update_status(f"Found {self.files_found} file(s) / {self.files_scanned} scanned")
+
     def stop_search(self):
         """Stop the search operation."""
         self.stop_event.set()
@@ -854,11 +1055,13 @@ class FolderBrowser:
             if not values or not all(values):
                 return  # Skip if it's a parent/folder item
 
-            file_path = values[1]
-            if not os.path.exists(file_path):
-                messagebox.showerror("Error", f"File not found: {file_path}")
-                return
+            file_path = str(values[1])
+            if file_path == self.current_preview_file:
+                return  # Already shown, e.g. the virtual list re-rendered its rows
 
+            # The selection moved: neighbours of the old one are no longer worth decoding
+            self.preview_prefetcher.cancel()
+            self.current_preview_row = self.row_for_item(item)
             self.current_preview_file = file_path
             self.zoom_level = 1.0
 
@@ -870,35 +1073,83 @@ class FolderBrowser:
                 self.preview_text.config(state=tk.DISABLED)
                 self.preview_text.pack_forget()
 
-            preview_file(self, file_path)
+            self.preview_pipeline.request(file_path, preview_canvas_size(self))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to preview file: {str(e)}")
             logging.error(f"Preview error: {str(e)}")
 
-    def sort_column(self, tv, col, reverse):
-        l = [(tv.set(k, col), k) for k in tv.get_children('')]
+    def show_decoded_preview(self, file_path, preview, error):
+        """Show a preview decoded in the background, unless the selection moved on."""
+        if file_path != self.current_preview_file:
+            return
         try:
-            l.sort(key=lambda t: float(t[0]), reverse=reverse)
-        except ValueError:
-            l.sort(reverse=reverse)
-
-        for index, (val, k) in enumerate(l):
-            tv.move(k, '', index)
+            if error is not None:
+                display_error(self, error)
+            elif preview is not None:
+                show_preview(self, preview)
+        except Exception as e:
+            logging.error(f"Preview error: {str(e)}")
+            error = str(e)
+            display_error(self, error)
+        if error is not None:
+            # Not shown, so selecting the file again retries it
+            self.current_preview_file = None
+        self.prefetch_neighbour_previews()
+
+    def prefetch_neighbour_previews(self):
+        """Start decoding the results around the previewed one into the preview cache."""
+        row = self.current_preview_row
+        if row is None or row >= len(self.result_store):
+            return
+        store = self.result_store
+        paths = [store.path(neighbour) for neighbour in store.neighbours(row, PREFETCH_NEIGHBOURS)]
+        self.preview_prefetcher.schedule(paths, preview_canvas_size(self))
+
+    def row_for_item(self, item):
+        """Get the result store row shown by a tree item, or None."""
+        if self.results_view.active:
+            return self.results_view.item_rows.get(item)
+        # The plain tree holds at most VIRTUAL_THRESHOLD rows, so a scan is cheap
+        for row, row_item in self.row_items.items():
+            if row_item == item:
+                return row
+        return None
 
+    def sort_column(self, tv, col, reverse):
+        """Sort the results by a column, on the raw values kept in the result store."""
+        if self.result_store:
+            self.result_store.sort(col, reverse)
+            if self.results_view.active:
+                self.results_view.render()
+            else:
+                self.reorder_result_items()
         tv.heading(col, command=lambda: self.sort_column(tv, col, not reverse))
 
+    def reorder_result_items(self):
+        """Move the result items of the tree into the order of the result store."""
+        store = self.result_store
+        for group, rows in enumerate(store.group_rows):
+            parent = self.result_parents.get(store.targets[group], '') if store.grouped else ''
+            for index, row in enumerate(rows):
+                item = self.row_items.get(row)
+                if item is None:
+                    continue
+                self.results_tree.move(item, parent, index)
+                self.results_tree.item(item, tags=('evenrow' if index % 2 == 0 else 'oddrow',))
+        self.hover_item = None  # Its saved tags no longer match its position
+
     def on_mouse_wheel(self, event):
         self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
 
     def prev_pdf_page(self):
-        if self.pdf_doc and self.pdf_page_number > 0:
+        if self.pdf_doc is not None and self.pdf_page_number > 0:
             self.pdf_page_number -= 1
-            preview_file(self, self.current_preview_file, self.pdf_page_number)
+            show_pdf_page(self, self.pdf_page_number)
 
     def next_pdf_page(self):
-        if self.pdf_doc and self.pdf_page_number < len(self.pdf_doc) - 1:
+        if self.pdf_doc is not None and self.pdf_page_number < pdf_page_count(self.pdf_doc) - 1:
             self.pdf_page_number += 1
-            preview_file(self, self.current_preview_file, self.pdf_page_number)
+            show_pdf_page(self, self.pdf_page_number)
 
     def zoom_in(self):
         self.zoom_level += 0.1
@@ -910,9 +1161,28 @@ class FolderBrowser:
             update_preview_image(self)
 
     def select_all_results(self):
+        if self.results_view.active:
+            self.results_view.select_all()
+            return
         for item in self.results_tree.get_children():
             self.results_tree.selection_add(item)
 
+    def get_selected_paths(self) -> List[str]:
+        """
+        Get the paths of the selected results.
+
+        Returns:
+            List[str]: Selected file paths, including rows scrolled out of view in virtual mode
+        """
+        if self.results_view.active:
+            return self.results_view.selected_paths()
+        paths = []
+        for item in self.results_tree.selection():
+            values = self.results_tree.item(item)['values']
+            if values and all(values):
+                paths.append(str(values[1]))
+        return paths
+
     def add_to_search_history(self, search_text):
         """Add search text to history and maintain max size."""
         if search_text not in self.search_history:
@@ -1051,6 +1321,14 @@ class FolderBrowser:
         )
         self.search_content_checkbox.pack(anchor=tk.W, pady=2)
 
+        self.use_index_checkbox = ttk.Checkbutton(
+            search_modes,
+            text="Use Index",
+            variable=self.use_index_var,
+            style='Modern.TCheckbutton'
+        )
+        self.use_index_checkbox.pack(anchor=tk.W, pady=2)
+
         # Right side - Sort options
         sort_options = ttk.Frame(options_container, style='Modern.TFrame')
         sort_options.pack(side=tk.RIGHT, fill=tk.Y, padx=5)
@@ -1089,3 +1367,20 @@ class FolderBrowser:
         )
         search_type.pack(side=tk.LEFT, padx=5)
 
+        # Match mode dropdown
+        ttk.Label(
+            sort_options,
+            text="Match Mode:",
+            style='Modern.TLabel'
+        ).pack(side=tk.LEFT, padx=5)
+
+        self.match_mode_var = tk.StringVar(value="Substring")
+        match_mode = ttk.Combobox(
+            sort_options,
+            textvariable=self.match_mode_var,
+            values=list(MATCH_MODES),
+            state="readonly",
+            width=15
+        )
+        match_mode.pack(side=tk.LEFT, padx=5)
+
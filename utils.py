@@ -1,5 +1,7 @@
 import logging
+import time
 from datetime import datetime
+from typing import List, Tuple
 
 logging.basicConfig(level=logging.ERROR, filename='app_errors.log')
 
@@ -58,6 +60,51 @@ def format_size(size):
         logging.error(f"Error formatting size: {e}")
         return f"Error formatting size: {e}"
 
+def format_duration(seconds):
+    """
+    Format a duration in seconds compactly (e.g., 45s, 3m 05s, 1h 02m).
+
+    Parameters:
+    seconds (float): The duration, or None when it is unknown.
+
+    Returns:
+    str: The formatted duration, or "--" when unknown.
+    """
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+class StartupTimer:
+    """
+    Collect the time spent in each phase of application startup.
+
+    Created before the heavy imports; every mark() closes the phase that
+    started at the previous mark.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        """Record the time spent since the previous mark under the given phase name."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self) -> str:
+        """Format the recorded phases and the total as a small table in milliseconds."""
+        lines = ["Startup timing (ms):"]
+        lines += [f"  {phase:<12}{seconds * 1000:>9.1f}" for phase, seconds in self.phases]
+        lines.append(f"  {'total':<12}{(self.last - self.start) * 1000:>9.1f}")
+        return "\n".join(lines)
+
 # Example usage:
 # print(format_size(1024)) # Outputs: "1.00 KB"
 # print(format_size(1048576)) # Outputs: "1.00 MB"